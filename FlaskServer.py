@@ -1,42 +1,110 @@
 from flask import Flask, render_template, request, jsonify, Response, stream_with_context
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.exceptions import BadRequest, HTTPException
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import asyncio
 import json
+import orjson
 import os
-from ollama import chat
-from pydantic import BaseModel
+import ollama
+from pydantic import BaseModel, TypeAdapter
 from typing import Optional
+from dataclasses import asdict, dataclass, replace
 import threading
 import queue
 import time
+import zlib
+from contextvars import ContextVar
 import websocket as ws_client   # websocket-client package
 
+
+class ORJSONProvider(JSONProvider):
+    """Route jsonify / request.get_json through orjson instead of stdlib json."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+# Compress regular responses. flask-compress buffers streamed bodies until the
+# end, which would stall live tokens, so SSE is gzip'd per frame by _sse_response.
+app.config["COMPRESS_STREAMS"] = False
+Compress(app)
+# Reject oversize bodies before they are read. Routes that legitimately carry
+# more (file contents, chat history) raise their own limit per request.
+app.config["MAX_CONTENT_LENGTH"] = 1 * 1024 * 1024
+_SEND_COMMAND_MAX_CONTENT_LENGTH = 16 * 1024 * 1024   # edit_file payloads
+_AI_COMMAND_MAX_CONTENT_LENGTH = 8 * 1024 * 1024      # conversation history
 
 # Configuration
-FASTAPI_SERVER_URL = "http://192.168.137.104:8000/execute"
-DEFAULT_TIMEOUT = 35
-TRANSMISSION_MODE = "wifi"  # "wifi" or "lora"
-LORA_DESTINATION = 0  # Integer destination for LoRA
+@dataclass(frozen=True)
+class Cfg:
+    """Runtime settings editable via /config.
+
+    Handlers read _CFG once per request; /config swaps in a new instance, so a
+    request never sees a half-applied update.
+    """
+    server_url: str
+    timeout: int
+    mode: str              # "wifi" or "lora"
+    lora_destination: int  # Integer destination for LoRA
+    jetson_ws_url: str
+
+
+_CFG = Cfg(
+    server_url="http://192.168.137.104:8000/execute",
+    timeout=35,
+    mode="wifi",
+    lora_destination=0,
+    jetson_ws_url="ws://192.168.1.100:9001",   # Set via /config in the UI
+)
+_cfg_lock = threading.Lock()   # serializes /config read-modify-write
+_CONFIG_CACHE = orjson.dumps(asdict(_CFG))   # /config GET body, rebuilt on POST
 LORA_MESSAGE_PATH = r"D:\message.json"  # Path where LoRA transmitter reads messages from
 OLLAMA_MODEL = "qwen3:0.6b"  # Ollama model for AI assistant
+_OLLAMA = ollama.Client()    # shared client, reused by every /ai_command
 
 # ── 3D Mapping globals ────────────────────────────────────────────────────────
-JETSON_WS_URL = "ws://192.168.1.100:9001"   # Set via /config in the UI
 _sse_clients: list[queue.Queue] = []         # One queue per open SSE connection
 _sse_lock = threading.Lock()
+# Set by the ASGI wrapper when the client goes away; None under the Werkzeug server
+_client_gone: ContextVar[Optional[threading.Event]] = ContextVar("client_gone", default=None)
 _jetson_ws_lock = threading.Lock()
 _jetson_ws_connected = False
 _jetson_ws_handle = None                     # websocket.WebSocketApp instance
 _map_point_count = 0
 _map_seq = -1
 
+# Pooled keep-alive session for rover HTTP calls, so repeated commands reuse
+# the TCP connection instead of paying a fresh handshake each time.
+# Retries cover connection failures only: every relay is a POST, and
+# commands like bash_command must not run twice on the rover.
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.1),
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
 # Load AI system prompt from markdown file
 _PROMPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ai_system_prompt.md")
 with open(_PROMPT_PATH, "r", encoding="utf-8") as _f:
     AI_SYSTEM_PROMPT = _f.read()
 
-# Load Robot.py and extract just the essential API documentation (not full source)
-_ROBOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "robot", "Robot.py")
+# Hand-written Rover API reference appended to the prompt. Robot.py itself is
+# deliberately not read in: its full source would multiply the prompt tokens
+# the model has to process on every request.
 _ROBOT_API_DOCS = """
 ## Rover Class API Reference
 
@@ -80,6 +148,56 @@ rover.cleanup()
 
 AI_SYSTEM_PROMPT += _ROBOT_API_DOCS
 
+# Full system prompt per transmission mode, built once instead of per request
+_SYSTEM_CONTENT_BY_MODE = {
+    m: AI_SYSTEM_PROMPT + f"\n\n## Current Transmission Mode\nThe current mode is **{m}**."
+    for m in ("wifi", "lora")
+}
+
+# ── SSE framing ───────────────────────────────────────────────────────────────
+# Frames are assembled as constant prefix + orjson-encoded value + suffix, so
+# no per-frame dict or f-string is built. Fixed control frames are constants.
+_SSE_THINKING_PREFIX = b'data: {"type":"thinking","content":'
+_SSE_CONTENT_PREFIX = b'data: {"type":"content","content":'
+_SSE_RESULT_PREFIX = b'data: {"type":"result","command":'
+_SSE_ERROR_PREFIX = b'data: {"type":"error","error":'
+_SSE_FRAME_SUFFIX = b'}\n\n'
+_SSE_THINKING_START = b'data: {"type":"thinking_start"}\n\n'
+_SSE_THINKING_END = b'data: {"type":"thinking_end"}\n\n'
+_SSE_DONE = b'data: {"type":"done"}\n\n'
+_SSE_KEEPALIVE = b'data: {"type":"keepalive"}\n\n'
+# Consecutive tokens are coalesced into one frame until either limit is hit
+_SSE_BATCH_BYTES = 4096
+_SSE_BATCH_SECONDS = 0.05
+
+
+def _json_body():
+    """Parse the raw request body with orjson, skipping Werkzeug's mimetype/cache path."""
+    try:
+        return orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError as exc:
+        raise BadRequest(f"Invalid JSON body: {exc}")
+
+
+def _gzip_frames(frames):
+    """Gzip an SSE frame iterator, sync-flushing after every frame so each event reaches the client immediately."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for frame in frames:
+        if isinstance(frame, str):
+            frame = frame.encode()
+        yield compressor.compress(frame) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def _sse_response(frames):
+    """Wrap an SSE generator in a streaming Response, gzip'd when the client accepts it."""
+    if "gzip" not in request.headers.get("Accept-Encoding", ""):
+        return Response(stream_with_context(frames), mimetype='text/event-stream')
+    response = Response(stream_with_context(_gzip_frames(frames)), mimetype='text/event-stream')
+    response.headers["Content-Encoding"] = "gzip"
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
 
 def _broadcast_to_sse(message: str):
     """Push a raw JSON string to every open SSE client queue."""
@@ -129,7 +247,7 @@ def _jetson_ws_thread():
                 print(f"[Map] WebSocket error: {error}")
 
             app_ws = ws_client.WebSocketApp(
-                JETSON_WS_URL,
+                _CFG.jetson_ws_url,
                 on_message=on_message,
                 on_open=on_open,
                 on_close=on_close,
@@ -148,6 +266,76 @@ class RoverCommand(BaseModel):
     fields: dict
 
 
+# The schema and validator are constant — build them once instead of on every /ai_command
+_ROVER_COMMAND_SCHEMA = RoverCommand.model_json_schema()
+_ROVER_COMMAND_ADAPTER = TypeAdapter(RoverCommand)
+
+_STREAM_END = object()   # producer -> generator end-of-stream marker
+
+
+def _ollama_producer(chunk_queue: queue.Queue, stop: threading.Event, messages: list):
+    """Background thread: pull the Ollama stream and hand chunks to the SSE generator."""
+    def put(item):
+        # Give up if the client went away rather than blocking on a full queue
+        while not stop.is_set():
+            try:
+                chunk_queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        stream = _OLLAMA.chat(
+            model=OLLAMA_MODEL,
+            messages=messages,
+            think=True,
+            stream=True,
+            format=_ROVER_COMMAND_SCHEMA,
+            options={'num_predict': 2000},  # Limit output length
+            keep_alive='1h',  # Keep model loaded for 1 hour to avoid startup delay
+        )
+        for chunk in stream:
+            if not put(chunk):
+                return
+    except Exception as exc:
+        put(exc)
+        return
+    put(_STREAM_END)
+
+
+def _warm_ollama():
+    """Background thread: load the model at startup so the first /ai_command skips the cold start."""
+    try:
+        _OLLAMA.generate(model=OLLAMA_MODEL, prompt="warmup", keep_alive='1h', options={'num_predict': 1})
+        print(f"[AI] Model {OLLAMA_MODEL} warmed up")
+    except Exception as exc:
+        print(f"[AI] Model warm-up failed: {exc}")
+
+
+def _drain_chunks(chunk_queue: queue.Queue, flush_deadline=None):
+    """Yield chunks from the producer queue, re-raising any producer error.
+
+    If flush_deadline() returns a monotonic time, wait no longer than that for
+    the next chunk and yield None when it passes, so the caller can flush.
+    """
+    while True:
+        deadline = flush_deadline() if flush_deadline is not None else None
+        try:
+            if deadline is None:
+                item = chunk_queue.get()
+            else:
+                item = chunk_queue.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            yield None
+            continue
+        if item is _STREAM_END:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
 @app.route('/')
 def index():
     """Render the main UI page"""
@@ -157,15 +345,19 @@ def index():
 @app.route('/send_command', methods=['POST'])
 def send_command():
     """Forward command via WiFi to FastAPI server, or save to file for LoRA"""
+    request.max_content_length = _SEND_COMMAND_MAX_CONTENT_LENGTH
     try:
-        data = request.get_json()
-        mode = data.pop('mode', TRANSMISSION_MODE)
+        data = _json_body()
+        cfg = _CFG
+        mode = data.pop('mode', cfg.mode)
 
         if mode == 'lora':
-            return _send_lora(data)
+            return _send_lora(data, cfg)
         else:
-            return _send_wifi(data)
+            return _send_wifi(data, cfg)
 
+    except HTTPException:
+        raise
     except Exception as e:
         return jsonify({
             "success": False,
@@ -173,17 +365,53 @@ def send_command():
         }), 500
 
 
-def _send_wifi(data):
+def _send_wifi(data, cfg):
     """Send command over WiFi to FastAPI server"""
     try:
-        timeout = data.pop('timeout', DEFAULT_TIMEOUT)
-        response = requests.post(FASTAPI_SERVER_URL, json=data, timeout=timeout)
+        timeout = data.pop('timeout', cfg.timeout)
+        response = _SESSION.post(cfg.server_url, json=data, timeout=timeout, stream=True)
+
+        if "application/json" not in response.headers.get("Content-Type", ""):
+            with response:
+                return jsonify({
+                    "success": True,
+                    "status_code": response.status_code,
+                    "data": response.json()
+                })
+
+        # Pull the first chunk before committing to a 200, so connect and
+        # first-read failures still reach the error envelopes below
+        chunks = response.iter_content(chunk_size=8192)
+        try:
+            first = next(chunks, b'')
+        except BaseException:
+            response.close()
+            raise
+
+        if not first:
+            # Empty body: nothing to splice, report it as null data
+            response.close()
+            return jsonify({
+                "success": True,
+                "status_code": response.status_code,
+                "data": None
+            })
+
+        def relay():
+            # Splice the rover's JSON body into the envelope as it arrives
+            # instead of parsing it and serializing it again. The status line
+            # has been sent by now, so an error later in the stream can only
+            # end the response: the client sees a truncated JSON body
+            try:
+                yield b'{"success":true,"status_code":%d,"data":' % response.status_code
+                yield first
+                yield from chunks
+                yield b'}'
+            finally:
+                response.close()
 
-        return jsonify({
-            "success": True,
-            "status_code": response.status_code,
-            "data": response.json()
-        })
+        return Response(relay(), content_type="application/json",
+                        headers={"X-Rover-Status": str(response.status_code)})
 
     except requests.exceptions.ConnectionError:
         return jsonify({
@@ -198,18 +426,23 @@ def _send_wifi(data):
         }), 408
 
 
-def _send_lora(data):
+def _send_lora(data, cfg):
     """Save command as JSON to file for LoRA transmission"""
     try:
-        lora_dest = data.pop('lora_destination', LORA_DESTINATION)
+        lora_dest = data.pop('lora_destination', cfg.lora_destination)
         data.pop('timeout', None)
 
         # Build payload with Recipient field for the LoRA transmitter
         payload = {"Recipient": int(lora_dest)}
         payload.update(data)
 
-        with open(LORA_MESSAGE_PATH, 'w') as f:
-            json.dump(payload, f, indent=2)
+        # Serialize once, then swap the file in atomically so the transmitter
+        # never reads a half-written message
+        blob = orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+        tmp_path = LORA_MESSAGE_PATH + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp_path, LORA_MESSAGE_PATH)
 
         return jsonify({
             "success": True,
@@ -217,7 +450,7 @@ def _send_lora(data):
                 "status": "queued",
                 "message": f"Payload written to {LORA_MESSAGE_PATH} for LoRA transmission",
                 "recipient": int(lora_dest),
-                "payload_size": len(json.dumps(payload))
+                "payload_size": len(blob)
             }
         })
 
@@ -236,34 +469,31 @@ def _send_lora(data):
 @app.route('/config', methods=['GET', 'POST'])
 def config():
     """Get or update server configuration"""
-    global FASTAPI_SERVER_URL, DEFAULT_TIMEOUT, TRANSMISSION_MODE, LORA_DESTINATION
+    global _CFG, _CONFIG_CACHE
 
     if request.method == 'POST':
-        data = request.get_json()
-        FASTAPI_SERVER_URL = data.get('server_url', FASTAPI_SERVER_URL)
-        DEFAULT_TIMEOUT = data.get('timeout', DEFAULT_TIMEOUT)
-        TRANSMISSION_MODE = data.get('mode', TRANSMISSION_MODE)
-        LORA_DESTINATION = data.get('lora_destination', LORA_DESTINATION)
-        global JETSON_WS_URL
-        new_jetson_url = data.get('jetson_ws_url')
-        if new_jetson_url:
-            JETSON_WS_URL = new_jetson_url
+        data = _json_body()
+        with _cfg_lock:
+            cfg = _CFG
+            _CFG = cfg = replace(
+                cfg,
+                server_url=data.get('server_url', cfg.server_url),
+                timeout=data.get('timeout', cfg.timeout),
+                mode=data.get('mode', cfg.mode),
+                lora_destination=data.get('lora_destination', cfg.lora_destination),
+                jetson_ws_url=data.get('jetson_ws_url') or cfg.jetson_ws_url,
+            )
+            _CONFIG_CACHE = orjson.dumps(asdict(cfg))
         return jsonify({
             "success": True,
-            "server_url": FASTAPI_SERVER_URL,
-            "timeout": DEFAULT_TIMEOUT,
-            "mode": TRANSMISSION_MODE,
-            "lora_destination": LORA_DESTINATION,
-            "jetson_ws_url": JETSON_WS_URL
+            "server_url": cfg.server_url,
+            "timeout": cfg.timeout,
+            "mode": cfg.mode,
+            "lora_destination": cfg.lora_destination,
+            "jetson_ws_url": cfg.jetson_ws_url
         })
 
-    return jsonify({
-        "server_url": FASTAPI_SERVER_URL,
-        "timeout": DEFAULT_TIMEOUT,
-        "mode": TRANSMISSION_MODE,
-        "lora_destination": LORA_DESTINATION,
-        "jetson_ws_url": JETSON_WS_URL
-    })
+    return Response(_CONFIG_CACHE, content_type="application/json")
 
 
 @app.route('/map_stream')
@@ -272,18 +502,21 @@ def map_stream():
     client_queue: queue.Queue = queue.Queue(maxsize=200)
     with _sse_lock:
         _sse_clients.append(client_queue)
+    # Under uvicorn a write to a closed connection doesn't fail, so the stream
+    # has to notice the disconnect itself or it would never be torn down
+    gone = _client_gone.get() or threading.Event()
 
     def generate():
         try:
             last_keepalive = time.time()
-            while True:
+            while not gone.is_set():
                 try:
                     chunk = client_queue.get(timeout=1.0)
                     yield f"data: {chunk}\n\n"
                     last_keepalive = time.time()
                 except queue.Empty:
                     if time.time() - last_keepalive > 15:
-                        yield f"data: {json.dumps({'type': 'keepalive'})}\n\n"
+                        yield _SSE_KEEPALIVE
                         last_keepalive = time.time()
         except GeneratorExit:
             pass
@@ -294,7 +527,7 @@ def map_stream():
                 except ValueError:
                     pass
 
-    return Response(stream_with_context(generate()), mimetype='text/event-stream')
+    return _sse_response(generate())
 
 
 @app.route('/map_control', methods=['POST'])
@@ -302,7 +535,7 @@ def map_control():
     """Forward start/stop/clear actions to the Jetson mapper."""
     global _map_point_count, _map_seq
 
-    data = request.get_json()
+    data = _json_body()
     action = data.get('action')
 
     if action == 'clear':
@@ -339,11 +572,12 @@ def ai_command():
     import time as pytime
     request_start = pytime.time()
     
+    request.max_content_length = _AI_COMMAND_MAX_CONTENT_LENGTH
     try:
-        data = request.get_json()
+        data = _json_body()
         user_message = data.get('message', '')
         history = data.get('history', [])
-        mode = data.get('mode', TRANSMISSION_MODE)
+        mode = data.get('mode', _CFG.mode)
 
         print(f"[AI] Request received at {pytime.time():.2f}, message length: {len(user_message)}, history items: {len(history)}")
 
@@ -351,13 +585,16 @@ def ai_command():
             return jsonify({"success": False, "error": "No message provided"}), 400
 
         # Build messages list: system prompt (with current mode), then history, then user msg
-        system_content = AI_SYSTEM_PROMPT + f"\n\n## Current Transmission Mode\nThe current mode is **{mode}**."
+        system_content = _SYSTEM_CONTENT_BY_MODE.get(mode, _SYSTEM_CONTENT_BY_MODE["wifi"])
         messages = [{"role": "system", "content": system_content}]
         messages.extend(history)
         messages.append({"role": "user", "content": user_message})
 
         prompt_prep_time = pytime.time() - request_start
-        print(f"[AI] Prompt prepared in {prompt_prep_time:.2f}s, total context: ~{len(system_content) + sum(len(str(m)) for m in messages):,} chars")
+        if app.debug:
+            # Message content dominates; str(m) would re-render every history dict
+            context_chars = sum(len(m.get("content", "")) for m in messages)
+            print(f"[AI] Prompt prepared in {prompt_prep_time:.2f}s, total context: ~{context_chars:,} chars")
         print(f"[AI] Calling Ollama model: {OLLAMA_MODEL}")
         ollama_start = pytime.time()
 
@@ -368,58 +605,153 @@ def ai_command():
             in_thinking = False
             first_chunk = True
 
-            stream = chat(
-                model=OLLAMA_MODEL,
-                messages=messages,
-                think=True,
-                stream=True,
-                format=RoverCommand.model_json_schema(),
-                options={'num_predict': 2000},  # Limit output length
-                keep_alive='1h',  # Keep model loaded for 1 hour to avoid startup delay
-            )
+            # Ollama runs on its own thread so token generation overlaps with
+            # flushing the previous frames to the client
+            chunk_queue = queue.Queue(maxsize=64)
+            stop = threading.Event()
+            threading.Thread(target=_ollama_producer, args=(chunk_queue, stop, messages), daemon=True).start()
+
+            # Pending token text for the current frame; its kind follows in_thinking
+            batch = []
+            batch_len = 0
+            last_flush = time.monotonic()
 
-            for chunk in stream:
-                if first_chunk:
-                    first_chunk = False
-                    elapsed = pytime.time() - ollama_start
-                    print(f"[AI] First chunk received from Ollama after {elapsed:.2f}s")
-                
-                # Thinking tokens
-                if chunk.message.thinking:
-                    if not in_thinking:
-                        in_thinking = True
-                        yield f"data: {json.dumps({'type': 'thinking_start'})}\n\n"
-                    thinking_buffer += chunk.message.thinking
-                    yield f"data: {json.dumps({'type': 'thinking', 'content': chunk.message.thinking})}\n\n"
-
-                # Content tokens (the actual JSON answer)
-                if chunk.message.content:
-                    if in_thinking:
-                        in_thinking = False
-                        yield f"data: {json.dumps({'type': 'thinking_end'})}\n\n"
-                    content_buffer += chunk.message.content
-                    yield f"data: {json.dumps({'type': 'content', 'content': chunk.message.content})}\n\n"
+            def batch_frame():
+                prefix = _SSE_THINKING_PREFIX if in_thinking else _SSE_CONTENT_PREFIX
+                return prefix + orjson.dumps("".join(batch)) + _SSE_FRAME_SUFFIX
+
+            def flush_deadline():
+                # Only bound the wait while a partial frame is pending
+                return last_flush + _SSE_BATCH_SECONDS if batch else None
+
+            try:
+                for chunk in _drain_chunks(chunk_queue, flush_deadline):
+                    if chunk is None:
+                        # No token within the flush window: send what we have
+                        yield batch_frame()
+                        batch.clear()
+                        batch_len = 0
+                        last_flush = time.monotonic()
+                        continue
+
+                    if first_chunk:
+                        first_chunk = False
+                        elapsed = pytime.time() - ollama_start
+                        print(f"[AI] First chunk received from Ollama after {elapsed:.2f}s")
+
+                    # Thinking tokens
+                    if chunk.message.thinking:
+                        if not in_thinking:
+                            if batch:
+                                yield batch_frame()
+                                batch.clear()
+                                batch_len = 0
+                                last_flush = time.monotonic()
+                            in_thinking = True
+                            yield _SSE_THINKING_START
+                        thinking_buffer += chunk.message.thinking
+                        batch.append(chunk.message.thinking)
+                        batch_len += len(chunk.message.thinking)
+
+                    # Content tokens (the actual JSON answer)
+                    if chunk.message.content:
+                        if in_thinking:
+                            if batch:
+                                yield batch_frame()
+                                batch.clear()
+                                batch_len = 0
+                                last_flush = time.monotonic()
+                            in_thinking = False
+                            yield _SSE_THINKING_END
+                        content_buffer += chunk.message.content
+                        batch.append(chunk.message.content)
+                        batch_len += len(chunk.message.content)
+
+                    now = time.monotonic()
+                    if batch and (batch_len >= _SSE_BATCH_BYTES or now - last_flush >= _SSE_BATCH_SECONDS):
+                        yield batch_frame()
+                        batch.clear()
+                        batch_len = 0
+                        last_flush = now
+
+                if batch:
+                    yield batch_frame()
+            finally:
+                stop.set()
 
             # Parse final structured result
             try:
-                command = RoverCommand.model_validate_json(content_buffer)
-                yield f"data: {json.dumps({'type': 'result', 'command': command.model_dump()})}\n\n"
+                command = _ROVER_COMMAND_ADAPTER.validate_json(content_buffer)
+                yield _SSE_RESULT_PREFIX + orjson.dumps(command.model_dump(mode="json")) + _SSE_FRAME_SUFFIX
             except Exception as parse_err:
-                yield f"data: {json.dumps({'type': 'error', 'error': f'Failed to parse LLM output: {str(parse_err)}'})}\n\n"
+                yield _SSE_ERROR_PREFIX + orjson.dumps(f'Failed to parse LLM output: {str(parse_err)}') + _SSE_FRAME_SUFFIX
 
-            yield "data: {\"type\": \"done\"}\n\n"
+            yield _SSE_DONE
 
-        return Response(stream_with_context(generate()), mimetype='text/event-stream')
+        return _sse_response(generate())
 
+    except HTTPException:
+        raise
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
-# Start Jetson WS client in background (only in reloader worker, not the parent process)
+class _ConcurrentWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi that gives every request its own worker thread.
+
+    Plain WsgiToAsgi runs all requests on one shared thread, so a 35 s rover
+    call in /send_command would stall /config and /ai_command behind it.
+    """
+
+    async def __call__(self, scope, receive, send):
+        # WsgiToAsgi stops reading receive() once the body is in, so nothing
+        # would see http.disconnect; watch for it and expose it to the app
+        # through _client_gone (the context is copied into the worker thread)
+        gone = threading.Event()
+        body_read = asyncio.Event()
+
+        async def receive_body():
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                gone.set()
+            elif not message.get("more_body"):
+                body_read.set()
+            return message
+
+        async def watch_disconnect():
+            await body_read.wait()
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            gone.set()
+
+        token = _client_gone.set(gone)
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            async with ThreadSensitiveContext():
+                await super().__call__(scope, receive_body, send)
+        finally:
+            watcher.cancel()
+            _client_gone.reset(token)
+
+
+# ASGI entry point: uvicorn FlaskServer:asgi_app --host 0.0.0.0 --port 5000
+asgi_app = _ConcurrentWsgiToAsgi(app)
+
+# Start Jetson WS client and Ollama warm-up in background (only in reloader worker, not the parent process)
 if not os.environ.get("TESTING"):
     _map_thread = threading.Thread(target=_jetson_ws_thread, daemon=True)
     _map_thread.start()
+    threading.Thread(target=_warm_ollama, daemon=True).start()
 
 if __name__ == '__main__':
     os.makedirs('templates', exist_ok=True)
-    app.run(debug=False, host='0.0.0.0', port=5000)
+    if os.environ.get("FLASK_DEBUG"):
+        # Werkzeug reloader + debugger; development only
+        app.run(debug=True, host='0.0.0.0', port=5000)
+    else:
+        import uvicorn
+        # Pass the object, not "FlaskServer:asgi_app" — re-importing the module
+        # by name would start a second Jetson WS thread.
+        # No limit_concurrency: open /map_stream viewers would count against
+        # the cap, and once it filled every endpoint would answer 503
+        uvicorn.run(asgi_app, host='0.0.0.0', port=5000, timeout_keep_alive=120)
@@ -4,9 +4,12 @@ import board
 import digitalio
 import adafruit_rfm9x
 import time
-import json
+import struct
 
-endian = 'little'
+# Packet header: recipient (u8), content id (u32), index (u16), total chunks (u16),
+# all little-endian, followed by up to 239 data bytes
+HEADER_FORMAT = '<BIHH'
+HEADER_SIZE = 9
 
 # Define radio frequency in MHz. Must match your
 # module. Can be a value like 915.0, 433.0, etc.
@@ -23,10 +26,37 @@ rfm95.tx_power = 23  # Max transmission power (5-23 dBm)
 # Set this to your device's ID (0-255)
 MY_ID = 0
 
+
+class Packet:
+    """Chunks received so far for one packet_content_id."""
+    __slots__ = ('total_chunks', 'chunks', 'timestamp', 'received')
+
+    def __init__(self, total_chunks):
+        self.total_chunks = total_chunks
+        self.chunks = [None] * total_chunks  # Indexed by chunk index
+        self.timestamp = time.monotonic()
+        self.received = 0
+
+    def add(self, index, data):
+        """Store a chunk; a repeated index replaces the earlier copy."""
+        if self.chunks[index] is None:
+            self.received += 1
+        self.chunks[index] = data
+
+    def complete(self):
+        return self.received == self.total_chunks
+
+
 # Storage for incoming packet data
-# Key: packet_content_id, Value: dict with chunks and metadata
+# Key: packet_content_id, Value: Packet
 packet_buffer = {}
 
+# (timestamp, packet_content_id) in arrival order, so the timeout sweep only
+# looks at the oldest entries. A plain list: CircuitPython's deque can't be indexed
+expiry_queue = []
+MESSAGE_TIMEOUT = 60  # seconds before an incomplete message is discarded
+SWEEP_INTERVAL = 5    # seconds between timeout sweeps
+
 def parse_packet(packet):
     """
     Parse a received packet and extract its components.
@@ -35,16 +65,17 @@ def parse_packet(packet):
         dict with keys: recipient_id, packet_content_id, index, total_chunks, data
         or None if packet is invalid
     """
-    if len(packet) < 9:
-        print(f"Invalid packet size: {len(packet)} bytes (expected at least 9)")
+    if len(packet) < HEADER_SIZE:
+        print(f"Invalid packet size: {len(packet)} bytes (expected at least {HEADER_SIZE})")
         return None
     
     try:
-        recipient_id = packet[0]
-        packet_content_id = int.from_bytes(packet[1:5], endian)
-        index = int.from_bytes(packet[5:7], endian)
-        total_chunks = int.from_bytes(packet[7:9], endian)
-        data = packet[9:]  # Remaining bytes are data (up to 239 bytes)
+        recipient_id, packet_content_id, index, total_chunks = struct.unpack_from(HEADER_FORMAT, packet, 0)
+        data = packet[HEADER_SIZE:]  # Remaining bytes are data (up to 239 bytes)
+        
+        if index >= total_chunks:
+            print(f"Invalid packet header: index {index} with {total_chunks} total chunks")
+            return None
         
         return {
             'recipient_id': recipient_id,
@@ -61,38 +92,50 @@ def reassemble_message(packet_content_id):
     """
     Reassemble all chunks for a given packet_content_id into the original JSON.
     
+    The text is passed through as sent rather than parsed and re-serialized;
+    the serial reader does the real JSON parsing.
+    
     Returns:
-        dict: The parsed JSON data, or None if reassembly failed
+        str: The JSON text, or None if reassembly failed
     """
     if packet_content_id not in packet_buffer:
         return None
     
-    packet_info = packet_buffer[packet_content_id]
-    chunks = packet_info['chunks']
-    total_chunks = packet_info['total_chunks']
+    pkt = packet_buffer[packet_content_id]
+    chunks = pkt.chunks
+    total_chunks = pkt.total_chunks
     
     # Check if we have all chunks
-    if len(chunks) != total_chunks:
+    if total_chunks == 0 or not pkt.complete():
         return None
     
-    # Reassemble in order
-    full_data = bytearray()
-    for i in range(total_chunks):
-        if i not in chunks:
-            return None
-        full_data.extend(chunks[i])
+    # Size the output up front; only the last chunk carries null byte padding
+    total_size = 0
+    for chunk in chunks:
+        total_size += len(chunk)
+    last = bytes(chunks[total_chunks - 1]).rstrip(b'\x00')
+    total_size -= len(chunks[total_chunks - 1]) - len(last)
     
-    # Remove null byte padding
-    full_data = bytes(full_data).rstrip(b'\x00')
+    # Reassemble in order, copying each chunk straight into place
+    full_data = bytearray(total_size)
+    view = memoryview(full_data)
+    offset = 0
+    for i in range(total_chunks - 1):
+        chunk = chunks[i]
+        view[offset:offset + len(chunk)] = chunk
+        offset += len(chunk)
+    view[offset:] = last
     
-    # Parse JSON
+    # Cheap sanity check: a JSON object that fits on one DATA_JSON line
     try:
-        json_str = full_data.decode('utf-8')
-        json_data = json.loads(json_str)
-        return json_data
+        json_str = full_data.decode('utf-8').strip()
     except Exception as e:
         print(f"Error decoding JSON: {e}")
         return None
+    if not json_str.startswith('{') or '\n' in json_str or '\r' in json_str:
+        print("Error decoding JSON: not a single-line JSON object")
+        return None
+    return json_str
 
 print(f"Listening for packets on {RADIO_FREQ_MHZ} MHz...")
 print(f"My ID: {MY_ID}")
@@ -100,6 +143,7 @@ print('-' * 50)
 
 # Counter for heartbeat
 loop_count = 0
+last_sweep = time.monotonic()
 
 # Main receive loop
 while True:
@@ -108,69 +152,80 @@ while True:
         packet = rfm95.receive(timeout=5.0)
         
         if packet is not None:
-            print(f"✓ Packet received! Length: {len(packet)} bytes, RSSI: {rfm95.last_rssi} dB")
-            # Parse the packet
-            parsed = parse_packet(packet)
-            
-            if parsed is None:
-                continue
-            
-            recipient_id = parsed['recipient_id']
-            packet_content_id = parsed['packet_content_id']
-            index = parsed['index']
-            total_chunks = parsed['total_chunks']
-            data = parsed['data']
-            
-            # Check if packet is for us (or broadcast to 255)
-            if recipient_id != MY_ID and recipient_id != 255:
-                print(f"⊗ Packet not for us (for ID {recipient_id})")
-                continue
-            
-            print(f"⇓ Received packet {index + 1}/{total_chunks} (Content ID: {packet_content_id})")
-            
-            # Initialize buffer for this packet_content_id if needed
-            if packet_content_id not in packet_buffer:
-                packet_buffer[packet_content_id] = {
-                    'total_chunks': total_chunks,
-                    'chunks': {},
-                    'timestamp': time.monotonic()
-                }
-            
-            # Store the chunk
-            packet_buffer[packet_content_id]['chunks'][index] = data
-            
-            # Check if we have all chunks
-            received_chunks = len(packet_buffer[packet_content_id]['chunks'])
-            if received_chunks == total_chunks:
-                print(f"✓ All {total_chunks} chunks received!")
-                print('-' * 50)
-                # Reassemble the message
-                json_data = reassemble_message(packet_content_id)
-                if json_data is not None:
-                    # Print with unique prefix so serial reader can filter this line
-                    print(f"DATA_JSON:{json.dumps(json_data)}")
-                    # Clean up buffer
-                    del packet_buffer[packet_content_id]
+            # Collect this packet's log lines and emit them as one write, so the
+            # USB serial link sees one transfer per packet instead of several
+            log = [f"✓ Packet received! Length: {len(packet)} bytes, RSSI: {rfm95.last_rssi} dB"]
+            try:
+                # Parse the packet
+                parsed = parse_packet(packet)
+                
+                if parsed is None:
+                    continue
+                
+                recipient_id = parsed['recipient_id']
+                packet_content_id = parsed['packet_content_id']
+                index = parsed['index']
+                total_chunks = parsed['total_chunks']
+                data = parsed['data']
+                
+                # Check if packet is for us (or broadcast to 255)
+                if recipient_id != MY_ID and recipient_id != 255:
+                    log.append(f"⊗ Packet not for us (for ID {recipient_id})")
+                    continue
+                
+                log.append(f"⇓ Received packet {index + 1}/{total_chunks} (Content ID: {packet_content_id})")
+                
+                # Initialize buffer for this packet_content_id if needed
+                # The transmitter reuses content ids, so a different chunk count
+                # or a second chunk 0 means a new message: drop the stale chunks
+                pkt = packet_buffer.get(packet_content_id)
+                if (pkt is None or pkt.total_chunks != total_chunks
+                        or (index == 0 and pkt.chunks[0] is not None)):
+                    pkt = packet_buffer[packet_content_id] = Packet(total_chunks)
+                    expiry_queue.append((pkt.timestamp, packet_content_id))
+                
+                # Store the chunk
+                pkt.add(index, data)
+                
+                # Check if we have all chunks
+                received_chunks = pkt.received
+                if pkt.complete():
+                    log.append(f"✓ All {total_chunks} chunks received!")
+                    log.append('-' * 50)
+                    print('\n'.join(log))
+                    log = []
+                    # Reassemble the message
+                    json_str = reassemble_message(packet_content_id)
+                    if json_str is not None:
+                        # Print with unique prefix so serial reader can filter this line;
+                        # kept as its own write so the line is never split
+                        print("DATA_JSON:" + json_str)
+                        # Clean up buffer
+                        del packet_buffer[packet_content_id]
+                    else:
+                        log.append("✗ Failed to reassemble message")
                 else:
-                    print("✗ Failed to reassemble message")
-            else:
-                print(f"  Progress: {received_chunks}/{total_chunks} chunks")
+                    log.append(f"  Progress: {received_chunks}/{total_chunks} chunks")
+            finally:
+                if log:
+                    print('\n'.join(log))
         else:
             # No packet received - print heartbeat every 10 loops (50 seconds)
             loop_count += 1
             if loop_count % 10 == 0:
                 print(f"Still listening... (loop {loop_count})")
         
-        # Clean up old incomplete messages (older than 60 seconds)
+        # Clean up old incomplete messages (older than MESSAGE_TIMEOUT seconds)
         current_time = time.monotonic()
-        expired_ids = []
-        for pcid, info in packet_buffer.items():
-            if current_time - info['timestamp'] > 60:
-                expired_ids.append(pcid)
-        
-        for pcid in expired_ids:
-            print(f"⚠ Timeout: Discarding incomplete message (Content ID: {pcid})")
-            del packet_buffer[pcid]
+        if current_time - last_sweep >= SWEEP_INTERVAL:
+            last_sweep = current_time
+            while expiry_queue and current_time - expiry_queue[0][0] > MESSAGE_TIMEOUT:
+                ts, pcid = expiry_queue.pop(0)
+                # Skip entries whose message already completed (or whose id was reused)
+                pkt = packet_buffer.get(pcid)
+                if pkt is not None and pkt.timestamp == ts:
+                    print(f"⚠ Timeout: Discarding incomplete message (Content ID: {pcid})")
+                    del packet_buffer[pcid]
     
     except Exception as e:
         print(f"Error in receive loop: {e}")
@@ -8,18 +8,35 @@
 #   python serial_reader.py
 #   python serial_reader.py --port COM5
 #   python serial_reader.py --port /dev/ttyACM0
+#   LOG_LEVEL=WARNING python serial_reader.py   # only warnings and errors
 
 import serial
 import serial.tools.list_ports
-import json
+import orjson
+import logging
+import os
 import sys
 import argparse
 import time
 
 from robot.command_executor import execute_command
 
-DATA_PREFIX = "DATA_JSON:"
-SERIAL_SUPPORTED_TYPES = ["bash_command", "edit_file", "basic_action"]
+DATA_PREFIX = b"DATA_JSON:"
+DATA_PREFIX_LEN = len(DATA_PREFIX)
+_TYPES = ("bash_command", "edit_file", "basic_action")
+SERIAL_SUPPORTED_TYPES = frozenset(_TYPES)
+SERIAL_SUPPORTED_TYPES_STR = ", ".join(_TYPES)
+RX_BUFFER_SIZE = 1 << 16
+
+log = logging.getLogger("serial_reader")
+
+
+def open_serial(port, baud):
+    """Open the serial port, enlarging the driver's receive buffer where supported."""
+    ser = serial.Serial(port, baud, timeout=1)
+    if hasattr(ser, 'set_buffer_size'):  # Windows only
+        ser.set_buffer_size(rx_size=RX_BUFFER_SIZE)
+    return ser
 
 
 def find_circuitpython_port():
@@ -31,10 +48,8 @@ def find_circuitpython_port():
         if 'circuitpython' in desc or 'adafruit' in manufacturer or 'feather' in desc:
             return port.device
     if ports:
-        print("Could not auto-detect CircuitPython port.")
-        print("Available ports:")
-        for p in ports:
-            print(f"  {p.device}: {p.description} [{p.manufacturer}]")
+        log.warning("Could not auto-detect CircuitPython port.\nAvailable ports:\n%s",
+                    "\n".join(f"  {p.device}: {p.description} [{p.manufacturer}]" for p in ports))
         return None
     return None
 
@@ -43,18 +58,63 @@ def handle_command(payload: dict) -> dict:
     """Validate and execute a command received over LoRa serial."""
     cmd_type = payload.get("type")
 
-    if cmd_type not in SERIAL_SUPPORTED_TYPES:
-        print(f"[WARN] Unsupported command type for serial: '{cmd_type}'. "
-              f"Supported: {', '.join(SERIAL_SUPPORTED_TYPES)}")
+    # Non-string types (e.g. a list) are unhashable; reject them rather than crash
+    if not isinstance(cmd_type, str) or cmd_type not in SERIAL_SUPPORTED_TYPES:
+        log.warning("[WARN] Unsupported command type for serial: '%s'. Supported: %s",
+                    cmd_type, SERIAL_SUPPORTED_TYPES_STR)
         return {
             "status": "error",
             "type": cmd_type,
-            "message": f"Unsupported type for serial mode. Supported: {', '.join(SERIAL_SUPPORTED_TYPES)}"
+            "message": f"Unsupported type for serial mode. Supported: {SERIAL_SUPPORTED_TYPES_STR}"
         }
 
     return execute_command(payload)
 
 
+def process_line(raw, verbose=False):
+    """Handle one raw line of receiver output, executing it if it carries a command."""
+    if verbose:
+        line = raw.decode('utf-8', errors='replace').strip()
+        if line:
+            log.info("[SERIAL] %s", line)
+
+    # Heartbeats and log lines are rejected on the bytes; only commands get decoded
+    if raw.startswith(DATA_PREFIX):
+        json_bytes = raw[DATA_PREFIX_LEN:]
+        try:
+            # orjson parses the bytes directly, no decode step needed
+            payload = orjson.loads(json_bytes)
+            if log.isEnabledFor(logging.INFO):
+                log.info("Received command: %s",
+                         orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode())
+
+            # Execute the command directly
+            result = handle_command(payload)
+
+            # Log the result
+            status = result.get("status", "unknown")
+            cmd_type = result.get("type", "unknown")
+            if status == "success":
+                if log.isEnabledFor(logging.INFO):
+                    # One record (one write) for the status line and any output
+                    lines = [f"[OK] {cmd_type} executed successfully"]
+                    if result.get("stdout"):
+                        lines.append(f"  stdout: {result['stdout'].strip()}")
+                    if result.get("output"):
+                        lines.append(f"  output: {result['output'].strip()}")
+                    if result.get("message"):
+                        lines.append(f"  message: {result['message']}")
+                    lines.append("-" * 50)
+                    log.info("\n".join(lines))
+            else:
+                log.error("[ERR] %s failed: %s\n%s", cmd_type,
+                          result.get('error_message', 'unknown error'), "-" * 50)
+
+        except orjson.JSONDecodeError as e:
+            log.error("Error parsing JSON: %s\nRaw data: %s", e,
+                      json_bytes.decode('utf-8', errors='replace').strip())
+
+
 def main():
     parser = argparse.ArgumentParser(description='Serial reader & executor for LoRa receiver')
     parser.add_argument('--port', type=str, help='Serial port (e.g., COM5, /dev/ttyACM0)')
@@ -62,77 +122,62 @@ def main():
     parser.add_argument('--verbose', action='store_true', help='Print all serial output')
     args = parser.parse_args()
 
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+                        format="%(message)s", stream=sys.stdout)
+
     port = args.port
     if port is None:
         port = find_circuitpython_port()
         if port is None:
-            print("Error: No serial port found. Use --port to specify one.")
+            log.error("Error: No serial port found. Use --port to specify one.")
             sys.exit(1)
 
-    print(f"Connecting to {port} at {args.baud} baud...")
+    log.info("Connecting to %s at %d baud...", port, args.baud)
 
     try:
-        ser = serial.Serial(port, args.baud, timeout=1)
+        ser = open_serial(port, args.baud)
     except serial.SerialException as e:
-        print(f"Error opening serial port: {e}")
+        log.error("Error opening serial port: %s", e)
         sys.exit(1)
 
-    print(f"Connected. Waiting for commands...")
-    print(f"Supported command types: {', '.join(SERIAL_SUPPORTED_TYPES)}")
-    print("-" * 50)
+    log.info("Connected. Waiting for commands...\nSupported command types: %s\n%s",
+             SERIAL_SUPPORTED_TYPES_STR, "-" * 50)
+
+    buf = bytearray()
 
     try:
         while True:
             try:
-                line = ser.readline().decode('utf-8', errors='replace').strip()
+                # Block for the first byte, then drain whatever else has arrived
+                # in one read instead of readline()'s byte-at-a-time loop
+                data = ser.read(ser.in_waiting or 1)
             except serial.SerialException:
-                print("Serial connection lost. Reconnecting...")
+                log.warning("Serial connection lost. Reconnecting...")
                 time.sleep(2)
+                buf.clear()
                 try:
                     ser.close()
-                    ser = serial.Serial(port, args.baud, timeout=1)
-                    print("Reconnected.")
+                    ser = open_serial(port, args.baud)
+                    log.info("Reconnected.")
                 except serial.SerialException:
                     pass
                 continue
 
-            if not line:
+            if not data:
                 continue
+            buf.extend(data)
 
-            if args.verbose:
-                print(f"[SERIAL] {line}")
+            end = buf.rfind(b'\n')
+            if end < 0:
+                continue
+            lines = buf[:end].split(b'\n')
+            del buf[:end + 1]
 
-            if line.startswith(DATA_PREFIX):
-                json_str = line[len(DATA_PREFIX):]
-                try:
-                    payload = json.loads(json_str)
-                    print(f"Received command: {json.dumps(payload, indent=2)}")
-
-                    # Execute the command directly
-                    result = handle_command(payload)
-
-                    # Log the result
-                    status = result.get("status", "unknown")
-                    cmd_type = result.get("type", "unknown")
-                    if status == "success":
-                        print(f"[OK] {cmd_type} executed successfully")
-                        if result.get("stdout"):
-                            print(f"  stdout: {result['stdout'].strip()}")
-                        if result.get("output"):
-                            print(f"  output: {result['output'].strip()}")
-                        if result.get("message"):
-                            print(f"  message: {result['message']}")
-                    else:
-                        print(f"[ERR] {cmd_type} failed: {result.get('error_message', 'unknown error')}")
-
-                    print("-" * 50)
-
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing JSON: {e}")
-                    print(f"Raw data: {json_str}")
+            for raw in lines:
+                process_line(raw, args.verbose)
 
     except KeyboardInterrupt:
-        print("\nStopped.")
+        log.info("\nStopped.")
     finally:
         ser.close()
 
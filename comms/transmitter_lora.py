@@ -8,8 +8,14 @@ import adafruit_rfm9x
 import time
 import json
 import random
+import struct
 
-endian = 'little'
+# Packet header: recipient (u8), content id (u32), index (u16), total chunks (u16),
+# all little-endian, followed by up to 239 data bytes (matches receiver_lora)
+HEADER_FORMAT = '<BIHH'
+HEADER_SIZE = 9
+CHUNK_SIZE = 239
+PACKET_SIZE = HEADER_SIZE + CHUNK_SIZE
 
 # Define radio frequency in MHz. Must match your
 # module. Can be a value like 915.0, 433.0, etc.
@@ -23,9 +29,16 @@ RESET = digitalio.DigitalInOut(board.RFM_RST)
 rfm95 = adafruit_rfm9x.RFM9x(board.SPI(), CS, RESET, RADIO_FREQ_MHZ)
 rfm95.tx_power = 23  # Max transmission power (5-23 dBm)
 
-def create_packets(json_data, recipient_id, packet_content_id):
+def count_chunks(size):
+    """Number of packets needed to carry size bytes of JSON."""
+    return (size + CHUNK_SIZE - 1) // CHUNK_SIZE
+
+def create_packets(json_bytes, recipient_id, packet_content_id):
     """
-    Create packets from JSON data with the specified structure.
+    Yield packets for serialized JSON bytes with the specified structure.
+    
+    Packets are built one at a time, so the next one is prepared while the
+    previous one is on air and the whole message is never held twice.
     
     The adafruit_rfm9x library adds a 4-byte header to every packet.
     The RFM95 FIFO max is 252 bytes, so our payload max is 248 bytes.
@@ -37,38 +50,28 @@ def create_packets(json_data, recipient_id, packet_content_id):
     - Bytes 7-8: Total number of indexes (2 bytes)
     - Bytes 9-247: Message content (239 bytes per chunk)
     """
-    # Convert JSON to bytes
-    json_bytes = json.dumps(json_data).encode('utf-8')
-    
     # Max payload = 252 (FIFO) - 4 (library header) = 248
     # Our header = 9 bytes, so chunk = 248 - 9 = 239
-    chunk_size = 239
-    total_chunks = (len(json_bytes) + chunk_size - 1) // chunk_size
+    chunk_size = CHUNK_SIZE
+    total_chunks = count_chunks(len(json_bytes))
     
     if total_chunks > 65535:
         raise ValueError(f"Data too large: {total_chunks} chunks needed, max is 65535")
     
-    packets = []
+    source = memoryview(json_bytes)
     for index in range(total_chunks):
         # Extract chunk of data
         start = index * chunk_size
         end = min(start + chunk_size, len(json_bytes))
-        chunk = json_bytes[start:end]
         
-        # Pad chunk to 243 bytes if it's the last one and shorter
-        chunk = chunk + b'\x00' * (chunk_size - len(chunk))
+        # Build the packet in place; the buffer starts zeroed, so a short
+        # last chunk is already null-padded to the full 239 bytes
+        packet = bytearray(PACKET_SIZE)
+        struct.pack_into(HEADER_FORMAT, packet, 0,
+                         recipient_id & 0xFF, packet_content_id, index, total_chunks)
+        packet[HEADER_SIZE:HEADER_SIZE + end - start] = source[start:end]
         
-        # Build packet
-        packet = bytearray()
-        packet.append(recipient_id & 0xFF)  # Byte 0: Recipient ID (1 byte)
-        packet.extend(packet_content_id.to_bytes(4, endian))  # Bytes 1-4: Packet Content ID
-        packet.extend(index.to_bytes(2, endian))  # Bytes 5-6: Index
-        packet.extend(total_chunks.to_bytes(2, endian))  # Bytes 7-8: Total chunks
-        packet.extend(chunk)  # Bytes 9-251: Content (243 bytes)
-        
-        packets.append(bytes(packet))
-    
-    return packets
+        yield packet
 
 # Read JSON from file
 with open('message.json', 'r') as f:
@@ -85,19 +88,27 @@ recipient_id = json_data.get('Recipient', 0)
 # Packet content ID starts at 0 and increments for each transmission
 packet_content_id = 0
 
-# Create packets
-packets = create_packets(json_data, recipient_id, packet_content_id)
+# Serialize once; the same bytes are chunked and measured for the log
+json_bytes = json.dumps(json_data).encode('utf-8')
+
+total_chunks = count_chunks(len(json_bytes))
 
 # Send packets
-print(f'Sending {len(packets)} packet(s) to recipient {recipient_id}')
+print(f'Sending {total_chunks} packet(s) to recipient {recipient_id}')
 print(f'Packet Content ID: {packet_content_id}')
-print(f'Total data size: {len(json.dumps(json_data))} bytes')
+print(f'Total data size: {len(json_bytes)} bytes')
 print('-' * 50)
 
-for i, packet in enumerate(packets):
+# Keep 0.1 s between sends, but count the time spent logging and building
+# the next packet against it instead of sleeping the full gap on top
+next_send = time.monotonic()
+for i, packet in enumerate(create_packets(json_bytes, recipient_id, packet_content_id)):
+    delay = next_send - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
     rfm95.send(packet)
-    print(f'✓ Sent packet {i+1}/{len(packets)} (Index: {i})')
-    time.sleep(0.1)
+    next_send = time.monotonic() + 0.1
+    print(f'✓ Sent packet {i+1}/{total_chunks} (Index: {i})')
 
 print('-' * 50)
 print(f'Successfully sent all packets to recipient {recipient_id}')
@@ -1,11 +1,22 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 from fastapi import FastAPI
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
 
 from robot.command_executor import execute_command, SUPPORTED_TYPES
 
 app = FastAPI(title="Remote Command Server")
 
+# basic_action runs arbitrary Python that can spin for a long time; give it
+# its own pool so it can't starve the shared threadpool other commands use.
+# One worker: scripts share the process-wide Drivebase, so running them one at
+# a time keeps two scripts from driving the motors at once or one script's
+# rover.cleanup() from closing the GPIO chip under another
+EXEC_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="basic_action")
+
 
 class CommandPayload(BaseModel):
     type: str
@@ -26,7 +37,13 @@ async def handle_execute(payload: CommandPayload):
     - read_image: Read image as base64
     """
     try:
-        return execute_command(payload.model_dump())
+        # Executors block (subprocesses, file I/O, exec), so keep them off the
+        # event loop; other requests and the health check keep being served
+        data = payload.model_dump()
+        if data["type"] == "basic_action":
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(EXEC_POOL, execute_command, data)
+        return await run_in_threadpool(execute_command, data)
     except Exception as e:
         return {
             "status": "error",
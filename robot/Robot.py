@@ -1,14 +1,28 @@
-import pi_servo_hat
 import lgpio
 import time
-import cv2
-import base64
 from pathlib import Path
 
+# pi_servo_hat and cv2 are imported where they're used: both are slow to
+# load and many callers only need the drivetrain
+
 class RockerBogie:
+    # One servo HAT per process: restart() is a slow I2C reset, so repeat
+    # constructions reuse the configured instance
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
     def __init__(self):
+        if self._initialized:
+            return
+        import pi_servo_hat
         self.hat = pi_servo_hat.PiServoHat()
         self.hat.restart()
+        self._initialized = True
     
     def setPositions(self, positions):
         for index, pos in enumerate(positions):
@@ -21,7 +35,19 @@ class RockerBogie:
         self.setPositions([90, 90, 150, 30])
 
 class Drivebase:
+    # The bridge pins can only be claimed once, so construct at most one
+    # Drivebase per process until cleanup() releases the chip
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
     def __init__(self):
+        if self._initialized:
+            return
         self.IN1 = 17
         self.IN2 = 27
         self.IN3 = 22
@@ -36,37 +62,33 @@ class Drivebase:
                 continue
         else:
             raise RuntimeError("Could not open any GPIO chip")
+        # Last duty written per pin, so repeated commands skip the GPIO call
+        self._duty = {}
         for pin in [self.IN1, self.IN2, self.IN3, self.IN4]:
             lgpio.gpio_claim_output(self._h, pin)
             lgpio.tx_pwm(self._h, pin, self._freq, 0)
+            self._duty[pin] = 0
+        self._initialized = True
 
     def _set_pwm(self, pin, duty):
         """duty: 0-100"""
-        lgpio.tx_pwm(self._h, pin, self._freq, duty)
+        if self._duty[pin] != duty:
+            lgpio.tx_pwm(self._h, pin, self._freq, duty)
+            self._duty[pin] = duty
+
+    def _set_side(self, fwd_pin, rev_pin, power):
+        """Drive one H-bridge side; power: -1.0 to 1.0"""
+        duty = abs(power) * 100
+        self._set_pwm(fwd_pin, duty if power > 0 else 0)
+        self._set_pwm(rev_pin, duty if power < 0 else 0)
 
     def setLeft(self, power):
         """power: -1.0 to 1.0"""
-        if power > 0:
-            self._set_pwm(self.IN1, power * 100)
-            self._set_pwm(self.IN2, 0)
-        elif power < 0:
-            self._set_pwm(self.IN1, 0)
-            self._set_pwm(self.IN2, abs(power) * 100)
-        else:
-            self._set_pwm(self.IN1, 0)
-            self._set_pwm(self.IN2, 0)
+        self._set_side(self.IN1, self.IN2, power)
 
     def setRight(self, power):
         """power: -1.0 to 1.0"""
-        if power > 0:
-            self._set_pwm(self.IN3, power * 100)
-            self._set_pwm(self.IN4, 0)
-        elif power < 0:
-            self._set_pwm(self.IN3, 0)
-            self._set_pwm(self.IN4, abs(power) * 100)
-        else:
-            self._set_pwm(self.IN3, 0)
-            self._set_pwm(self.IN4, 0)
+        self._set_side(self.IN3, self.IN4, power)
 
     def drive_instant(self, left, right):
         self.setLeft(left)
@@ -79,6 +101,28 @@ class Drivebase:
         self.setLeft(0)
         self.setRight(0)
 
+    @staticmethod
+    def _compile(commands):
+        """[(left, right, duration), ...] -> [(offset_ns, left, right), ...] ending with a stop"""
+        events = []
+        offset = 0
+        for left, right, duration in commands:
+            events.append((offset, left, right))
+            offset += int(duration * 1e9)
+        events.append((offset, 0, 0))
+        return events
+
+    def execute_sequence(self, commands):
+        """Run (left, right, duration) steps back to back, then stop. Each step starts at a
+        deadline measured from the sequence start, so sleep overshoot doesn't accumulate."""
+        t0 = time.monotonic_ns()
+        for offset, left, right in self._compile(commands):
+            remaining = t0 + offset - time.monotonic_ns()
+            if remaining > 0:
+                time.sleep(remaining / 1e9)
+            self.setLeft(left)
+            self.setRight(right)
+
     def cleanup(self):
         self.setLeft(0)
         self.setRight(0)
@@ -86,6 +130,7 @@ class Drivebase:
         for pin in [self.IN1, self.IN2, self.IN3, self.IN4]:
             lgpio.tx_pwm(self._h, pin, self._freq, 0)
         lgpio.gpiochip_close(self._h)
+        Drivebase._instance = None
 
     # Convenience movement methods
     def forward(self, power, duration=None):
@@ -142,6 +187,7 @@ class Camera:
         Raises:
             RuntimeError: If the camera cannot be opened.
         """
+        import cv2
         self.camera = cv2.VideoCapture(camera_index)
         if not self.camera.isOpened():
             raise RuntimeError(f"Failed to open camera at index {camera_index}")
@@ -172,6 +218,7 @@ class Camera:
             image (numpy.ndarray): The image to save.
             filepath (str): Path where the PNG file should be saved (without extension).
         """
+        import cv2
         # Ensure directory exists
         Path(filepath).parent.mkdir(parents=True, exist_ok=True)
         png_path = f"{filepath}.png"
@@ -294,6 +341,22 @@ class Rover:
         """
         self.drivebase.drive(left, right, duration)
     
+    def execute_sequence(self, commands):
+        """
+        Run a list of timed drive steps back to back, then stop.
+        
+        Step start times are scheduled from the beginning of the sequence, so
+        small sleep overruns don't add up over long sequences.
+        
+        Args:
+            commands (list): (left, right, duration) tuples, with powers in -1.0..1.0
+                            and durations in seconds.
+        
+        Example:
+            >>> rover.execute_sequence([(0.5, 0.5, 2), (-0.5, 0.5, 1), (0.5, 0.5, 2)])
+        """
+        self.drivebase.execute_sequence(commands)
+    
     def forward(self, power, duration=None):
         """
         Drive the rover forward.
@@ -5,11 +5,93 @@ Supports: bash_command, edit_file, basic_action, read_file, read_image
 
 import subprocess
 import os
+import selectors
+import shlex
+import signal
+import stat
 import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
 from io import StringIO
+from pathlib import Path
 import base64
 
 
+MAX_OUTPUT_BYTES = 1024 * 1024  # per stream; the oldest output is dropped first
+
+# Anything that needs the shell to interpret it (pipes, redirects, globs,
+# expansions, quoting, multiple lines) keeps the /bin/sh -c path
+_SHELL_METACHARS = frozenset('|&;<>()$`\\"\'*?[]{}~!#\n')
+
+
+def _spawn(command: str):
+    """
+    Start a command with its stdout/stderr piped. Plain "prog arg arg" commands
+    are exec'd directly (posix_spawn, no intermediate shell); anything else, or
+    a program the direct path can't find, goes through the shell as before.
+    """
+    kwargs = dict(stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                  start_new_session=True)  # so a timeout can kill the whole pipeline
+    argv = shlex.split(command) if _SHELL_METACHARS.isdisjoint(command) else None
+    if argv:
+        try:
+            return subprocess.Popen(argv, **kwargs)
+        except OSError:
+            pass  # e.g. shell builtins like cd, or VAR=x prefixes
+    return subprocess.Popen(command, shell=True, **kwargs)
+
+
+def _run_capped(command: str, timeout: float):
+    """
+    Run a shell command, reading stdout/stderr as they arrive and keeping at
+    most the last MAX_OUTPUT_BYTES of each.
+    Returns (return_code, stdout, stderr, timed_out).
+    """
+    proc = _spawn(command)
+    out, err = bytearray(), bytearray()
+    buffers = {proc.stdout.fileno(): out, proc.stderr.fileno(): err}
+    deadline = time.monotonic() + timeout
+    timed_out = False
+
+    with selectors.DefaultSelector() as sel:
+        for fd in buffers:
+            sel.register(fd, selectors.EVENT_READ)
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            for key, _ in sel.select(remaining):
+                chunk = os.read(key.fd, 65536)
+                if not chunk:
+                    sel.unregister(key.fd)
+                    continue
+                buf = buffers[key.fd]
+                buf += chunk
+                if len(buf) > MAX_OUTPUT_BYTES:
+                    del buf[:len(buf) - MAX_OUTPUT_BYTES]
+
+    if not timed_out:
+        try:
+            proc.wait(timeout=max(0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            timed_out = True
+    if timed_out:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        proc.wait()
+    proc.stdout.close()
+    proc.stderr.close()
+
+    return (proc.returncode, out.decode(errors="replace"),
+            err.decode(errors="replace"), timed_out)
+
+
 def execute_bash_command(command: str, timeout: int = 30) -> dict:
     """Execute a bash/shell command and return the result."""
     if not command:
@@ -22,30 +104,26 @@ def execute_bash_command(command: str, timeout: int = 30) -> dict:
         }
 
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=timeout
-        )
+        return_code, stdout, stderr, timed_out = _run_capped(command, timeout)
 
-        return {
-            "status": "success",
-            "type": "bash_command",
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-            "return_code": result.returncode,
-            "command": command
-        }
+        if timed_out:
+            return {
+                "status": "error",
+                "type": "bash_command",
+                "message": "Command execution timed out",
+                "error_type": "TimeoutError",
+                "error_message": f"Command '{command}' exceeded {timeout} second timeout",
+                "command": command,
+                "stdout": stdout,
+                "stderr": stderr
+            }
 
-    except subprocess.TimeoutExpired:
         return {
-            "status": "error",
+            "status": "success",
             "type": "bash_command",
-            "message": "Command execution timed out",
-            "error_type": "TimeoutError",
-            "error_message": f"Command '{command}' exceeded {timeout} second timeout",
+            "stdout": stdout,
+            "stderr": stderr,
+            "return_code": return_code,
             "command": command
         }
 
@@ -114,6 +192,61 @@ def execute_edit_file(file_name: str, file_content: str) -> dict:
         }
 
 
+class _ThreadCapture:
+    """
+    Stand-in for sys.stdout/sys.stderr that sends writes from a thread running
+    a basic_action to that action's buffer, and everything else to the real
+    stream. contextlib.redirect_stdout swaps the process-wide sys.stdout, which
+    tangles (and can leave stdout pointing at a dead buffer) when actions run
+    concurrently on different threads.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def _target(self):
+        buffer = getattr(self._local, "buffer", None)
+        return self._stream if buffer is None else buffer
+
+    def write(self, s):
+        return self._target().write(s)
+
+    def flush(self):
+        return self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._target(), name)
+
+
+_capture_lock = threading.Lock()
+
+
+@contextmanager
+def _capture_output(out, err):
+    """Route this thread's stdout/stderr writes into out/err for the duration."""
+    with _capture_lock:
+        if not isinstance(sys.stdout, _ThreadCapture):
+            sys.stdout = _ThreadCapture(sys.stdout)
+        if not isinstance(sys.stderr, _ThreadCapture):
+            sys.stderr = _ThreadCapture(sys.stderr)
+        stdout, stderr = sys.stdout, sys.stderr
+
+    prev_out = getattr(stdout._local, "buffer", None)
+    prev_err = getattr(stderr._local, "buffer", None)
+    stdout._local.buffer, stderr._local.buffer = out, err
+    try:
+        yield
+    finally:
+        stdout._local.buffer, stderr._local.buffer = prev_out, prev_err
+
+
+@lru_cache(maxsize=128)
+def _compile_action(action: str):
+    """Compile a basic_action snippet once; repeated actions reuse the code object."""
+    return compile(action, "<basic_action>", "exec")
+
+
 def execute_basic_action(action: str) -> dict:
     """Execute Python code and capture stdout."""
     if not action:
@@ -125,12 +258,8 @@ def execute_basic_action(action: str) -> dict:
             "error_message": "action field is required for basic_action"
         }
 
-    old_stdout = sys.stdout
-    old_stderr = sys.stderr
     redirected_output = StringIO()
     redirected_error = StringIO()
-    sys.stdout = redirected_output
-    sys.stderr = redirected_error
 
     local_namespace = {}
     error_occurred = False
@@ -138,16 +267,13 @@ def execute_basic_action(action: str) -> dict:
     error_type = ""
 
     try:
-        exec(action, {"__builtins__": __builtins__}, local_namespace)
-        output = redirected_output.getvalue()
+        with _capture_output(redirected_output, redirected_error):
+            exec(_compile_action(action), {"__builtins__": __builtins__}, local_namespace)
     except Exception as e:
         error_occurred = True
         error_type = type(e).__name__
         error_message = str(e)
-        output = redirected_output.getvalue()
-    finally:
-        sys.stdout = old_stdout
-        sys.stderr = old_stderr
+    output = redirected_output.getvalue()
 
     if error_occurred:
         return {
@@ -168,8 +294,55 @@ def execute_basic_action(action: str) -> dict:
     }
 
 
-def execute_read_file(file_name: str) -> dict:
-    """Read file contents."""
+MAX_READ_BYTES = 4 * 1024 * 1024  # larger files should go through a chunked transfer
+
+# read_file results keyed by absolute path and validated against the file's
+# (inode, mtime, size), so unchanged files are served without touching disk
+_FILE_CACHE = OrderedDict()
+_FILE_CACHE_MAX_ENTRIES = 64
+_FILE_CACHE_MAX_CHARS = 8 * 1024 * 1024
+# A file modified this recently could be rewritten again within the same mtime
+# tick (2 s on FAT) without its stamp changing, so it isn't cached yet
+_FILE_CACHE_SETTLE_NS = 2_000_000_000
+_file_cache_chars = 0
+_file_cache_lock = threading.Lock()
+
+
+def _read_text_cached(file_name: str, st: os.stat_result) -> str:
+    """Return the file's text, reusing the cached copy if the file hasn't changed."""
+    global _file_cache_chars
+    # procfs/sysfs files report size 0 and a fixed mtime while their contents
+    # change, so only settled, non-empty regular files have a trustworthy stamp
+    if (not stat.S_ISREG(st.st_mode) or st.st_size == 0
+            or time.time_ns() - st.st_mtime_ns < _FILE_CACHE_SETTLE_NS):
+        return Path(file_name).read_text()
+
+    key = os.path.abspath(file_name)
+    stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    with _file_cache_lock:
+        cached = _FILE_CACHE.get(key)
+        if cached is not None and cached[0] == stamp:
+            _FILE_CACHE.move_to_end(key)
+            return cached[1]
+
+    content = Path(file_name).read_text()
+
+    with _file_cache_lock:
+        old = _FILE_CACHE.pop(key, None)
+        if old is not None:
+            _file_cache_chars -= len(old[1])
+        _FILE_CACHE[key] = (stamp, content)
+        _file_cache_chars += len(content)
+        while (len(_FILE_CACHE) > _FILE_CACHE_MAX_ENTRIES
+               or _file_cache_chars > _FILE_CACHE_MAX_CHARS):
+            _, (_, evicted) = _FILE_CACHE.popitem(last=False)
+            _file_cache_chars -= len(evicted)
+    return content
+
+
+def execute_read_file(file_name: str, max_bytes: int = MAX_READ_BYTES) -> dict:
+    """Read file contents (refuses files larger than max_bytes)."""
     if not file_name:
         return {
             "status": "error",
@@ -180,18 +353,20 @@ def execute_read_file(file_name: str) -> dict:
         }
 
     try:
-        if not os.path.exists(file_name):
+        st = os.stat(file_name)
+        file_size = st.st_size
+        if file_size > max_bytes:
             return {
                 "status": "error",
                 "type": "read_file",
-                "message": "File not found",
-                "error_type": "FileNotFoundError",
-                "error_message": f"File '{file_name}' does not exist",
-                "file_name": file_name
+                "message": "File too large",
+                "error_type": "FileTooLargeError",
+                "error_message": f"File '{file_name}' is {file_size} bytes; read_file is limited to {max_bytes} bytes",
+                "file_name": file_name,
+                "size_bytes": file_size
             }
 
-        with open(file_name, 'r') as f:
-            content = f.read()
+        content = _read_text_cached(file_name, st)
 
         return {
             "status": "success",
@@ -201,6 +376,16 @@ def execute_read_file(file_name: str) -> dict:
             "size_bytes": len(content)
         }
 
+    except FileNotFoundError:
+        return {
+            "status": "error",
+            "type": "read_file",
+            "message": "File not found",
+            "error_type": "FileNotFoundError",
+            "error_message": f"File '{file_name}' does not exist",
+            "file_name": file_name
+        }
+
     except PermissionError:
         return {
             "status": "error",
@@ -232,6 +417,9 @@ def execute_read_file(file_name: str) -> dict:
         }
 
 
+_B64_CHUNK = 48 * 1024  # multiple of 3, so chunk encodings need no padding
+
+
 def execute_read_image(file_name: str) -> dict:
     """Read an image file and return it as base64."""
     if not file_name:
@@ -244,19 +432,16 @@ def execute_read_image(file_name: str) -> dict:
         }
 
     try:
-        if not os.path.exists(file_name):
-            return {
-                "status": "error",
-                "type": "read_image",
-                "message": "Image not found",
-                "error_type": "FileNotFoundError",
-                "error_message": f"Image '{file_name}' does not exist",
-                "file_name": file_name
-            }
-
+        # Encode in 3-byte-aligned chunks so the whole raw image is never held
+        # alongside its encoding; per-chunk output concatenates exactly
+        encoded = bytearray()
+        size_bytes = 0
         with open(file_name, 'rb') as f:
-            image_data = f.read()
-            image_base64 = base64.b64encode(image_data).decode('utf-8')
+            while chunk := f.read(_B64_CHUNK):
+                size_bytes += len(chunk)
+                encoded += base64.b64encode(chunk)
+        image_base64 = encoded.decode('ascii')
+        del encoded
 
         file_ext = os.path.splitext(file_name)[1].lower()
         mime_types = {
@@ -275,7 +460,17 @@ def execute_read_image(file_name: str) -> dict:
             "file_name": file_name,
             "image_data": image_base64,
             "mime_type": mime_type,
-            "size_bytes": len(image_data)
+            "size_bytes": size_bytes
+        }
+
+    except FileNotFoundError:
+        return {
+            "status": "error",
+            "type": "read_image",
+            "message": "Image not found",
+            "error_type": "FileNotFoundError",
+            "error_message": f"Image '{file_name}' does not exist",
+            "file_name": file_name
         }
 
     except PermissionError:
@@ -299,7 +494,16 @@ def execute_read_image(file_name: str) -> dict:
         }
 
 
-SUPPORTED_TYPES = ["bash_command", "edit_file", "basic_action", "read_file", "read_image"]
+# type -> (executor, payload fields passed positionally)
+_DISPATCH = {
+    "bash_command": (execute_bash_command, ("command",)),
+    "edit_file": (execute_edit_file, ("file_name", "file_content")),
+    "basic_action": (execute_basic_action, ("action",)),
+    "read_file": (execute_read_file, ("file_name",)),
+    "read_image": (execute_read_image, ("file_name",)),
+}
+
+SUPPORTED_TYPES = list(_DISPATCH)
 
 
 def execute_command(payload: dict) -> dict:
@@ -314,23 +518,9 @@ def execute_command(payload: dict) -> dict:
       - read_image:    requires 'file_name'
     """
     cmd_type = payload.get("type")
+    entry = _DISPATCH.get(cmd_type) if isinstance(cmd_type, str) else None
 
-    if cmd_type == "bash_command":
-        return execute_bash_command(payload.get("command"))
-
-    elif cmd_type == "edit_file":
-        return execute_edit_file(payload.get("file_name"), payload.get("file_content"))
-
-    elif cmd_type == "basic_action":
-        return execute_basic_action(payload.get("action"))
-
-    elif cmd_type == "read_file":
-        return execute_read_file(payload.get("file_name"))
-
-    elif cmd_type == "read_image":
-        return execute_read_image(payload.get("file_name"))
-
-    else:
+    if entry is None:
         return {
             "status": "error",
             "type": cmd_type,
@@ -338,3 +528,6 @@ def execute_command(payload: dict) -> dict:
             "error_type": "ValidationError",
             "error_message": f"Unknown type: '{cmd_type}'. Supported types: {', '.join(SUPPORTED_TYPES)}"
         }
+
+    executor, fields = entry
+    return executor(*[payload.get(field) for field in fields])
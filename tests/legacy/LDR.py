@@ -12,21 +12,41 @@ GPIO.setmode(GPIO.BOARD)
 RESISTORPIN = 16
 COVEREDTHRESHOLD = 8
 
-#print('seen')
-while True:
-    GPIO.setup(RESISTORPIN, GPIO.OUT)
-    GPIO.output(RESISTORPIN, GPIO.LOW)
-    time.sleep(0.1)
-    
-    GPIO.setup(RESISTORPIN, GPIO.IN)
-    currentTime = time.time()
-    diff = 0
+
+def main():
+    pin = RESISTORPIN
+
+    #print('seen')
+    while True:
+        GPIO.setup(pin, GPIO.OUT)
+        GPIO.output(pin, GPIO.LOW)
+        time.sleep(0.1)
     
-    while(GPIO.input(RESISTORPIN) == GPIO.LOW):
-        diff = time.time() - currentTime
-        
-    print(diff * 1000)
-    if (diff * 1000) > COVEREDTHRESHOLD:
-        print("covered")
-
-    time.sleep(0.1)
+        GPIO.setup(pin, GPIO.IN)
+        currentTime = time.perf_counter()
+        timed_out = False
+        if GPIO.input(pin) == GPIO.HIGH:
+            diff = 0  # Already charged - very bright
+        # Block in the GPIO driver until the capacitor charges past the threshold
+        # instead of polling; very dark readings give up after 2 s
+        elif GPIO.wait_for_edge(pin, GPIO.RISING, timeout=2000) is not None:
+            diff = time.perf_counter() - currentTime
+        elif GPIO.input(pin) == GPIO.HIGH:
+            # Rose before the edge detector was armed - the edge was missed
+            diff = 0
+        else:
+            timed_out = True
+
+        if timed_out:
+            print("timeout (> 2000 ms)")
+            print("covered")
+        else:
+            print(diff * 1000)
+            if (diff * 1000) > COVEREDTHRESHOLD:
+                print("covered")
+
+        time.sleep(0.1)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,78 +5,173 @@ Integrates with mpu6050 library to interpret accelerometer and gyroscope data
 """
 
 import mpu6050
-import time
 import math
+import struct
+import time
+import numpy as np
+from deadline_sleep import Ticker
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the core then runs as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+AXES = ('x', 'y', 'z')
+HISTORY = 64  # readings kept for batch analysis
+
+# Accel (6 bytes), temp (2) and gyro (6) sit in consecutive registers from
+# ACCEL_XOUT_H, so one 14-byte burst replaces three library reads
+ACCEL_XOUT_H = 0x3B
+BURST_LEN = 14
+_BURST = struct.Struct('>7h')
+GYRO_XOUT_H = 0x43  # gyro-only block, used where accel/temp aren't needed
+_GYRO_BURST = struct.Struct('>3h')
+ACCEL_SCALE = 16384.0  # LSB/g at the default +/-2g range
+GYRO_SCALE = 131.0     # LSB/(deg/s) at the default +/-250 deg/s range
+
+# Orientation names indexed by dominant axis * 2 + (reading > 0)
+_ORIENT_LUT = (
+    "Standing on Left Edge", "Standing on Right Edge",
+    "Standing on Top Edge", "Standing on Bottom Edge",
+    "Face Down", "Face Up",
+)
+
+
+def _as_array(data):
+    """Accept a {'x','y','z'} reading or a (3,) / (N, 3) array of readings"""
+    if isinstance(data, dict):
+        return np.array((data['x'], data['y'], data['z']), dtype=np.float64)
+    return np.asarray(data, dtype=np.float64)
+
+
+def _scalar_or_array(values):
+    """Unwrap 0-d NumPy results back to plain floats for single readings"""
+    return float(values) if np.ndim(values) == 0 else values
+
+
+@njit(cache=True, fastmath=True)
+def _interpret_core(ax, ay, az, gx, gy, gz, dt, yaw, pitch, roll, ox, oy, oz, alpha, seeded):
+    """
+    Per-sample scalar math behind interpret_data: accel tilt, magnitudes,
+    calibrated gyro, integrated yaw and the complementary-filtered pitch/roll
+    """
+    pitch_acc = math.degrees(math.atan2(ax, math.sqrt(ay * ay + az * az)))
+    roll_acc = math.degrees(math.atan2(ay, math.sqrt(ax * ax + az * az)))
+    accel_magnitude = math.sqrt(ax * ax + ay * ay + az * az)
+    
+    cgx = gx - ox
+    cgy = gy - oy
+    cgz = gz - oz
+    rotation_rate = math.sqrt(cgx * cgx + cgy * cgy + cgz * cgz)
+    
+    # Same result as math.remainder(yaw, 360), written in numba-supported ops
+    yaw = yaw + cgz * dt
+    yaw = yaw - 360.0 * round(yaw / 360.0)
+    
+    if seeded:
+        # Trust the accelerometer less the further it reads from 1g;
+        # accel pitch grows as the sensor rotates negatively about Y
+        a = min(max(alpha + 0.02 * abs(accel_magnitude - 1.0), 0.9), 0.999)
+        pitch = a * (pitch - cgy * dt) + (1 - a) * pitch_acc
+        roll = a * (roll + cgx * dt) + (1 - a) * roll_acc
+    else:
+        pitch = pitch_acc
+        roll = roll_acc
+    
+    return (pitch_acc, roll_acc, accel_magnitude, cgx, cgy, cgz,
+            rotation_rate, yaw, pitch, roll)
+
 
 class MPU6050Interpreter:
     def __init__(self, address=0x68):
         """Initialize the MPU6050 sensor"""
         self.mpu = mpu6050.mpu6050(address)
-        self.gyro_offset = {'x': 0, 'y': 0, 'z': 0}
+        self.gyro_offset = np.zeros(3)  # x, y, z bias in deg/s
         self.yaw = 0.0  # Accumulated yaw angle
-        self.last_time = time.time()
+        self.pitch = None  # Fused pitch/roll, seeded from the first accel reading
+        self.roll = None
+        self.alpha = 0.98  # Complementary filter gyro weight
+        self.last_time = time.monotonic()
+        
+        # Ring buffers of recent readings, one (HISTORY, 3) row per sample
+        self._accel_buf = np.zeros((HISTORY, 3), np.float32)
+        self._gyro_buf = np.zeros((HISTORY, 3), np.float32)
+        self._buf_pos = 0
+        self._buf_count = 0
         
     def read_sensor_data(self):
-        """Read raw sensor data"""
+        """
+        Read accel (g), gyro (deg/s) and temperature (C) in a single I2C burst
+        Accel and gyro are returned as (3,) arrays in x, y, z order
+        """
         try:
-            accelerometer_data = self.mpu.get_accel_data()
-            gyroscope_data = self.mpu.get_gyro_data()
-            temperature = self.mpu.get_temp()
+            raw = self.mpu.bus.read_i2c_block_data(self.mpu.address, ACCEL_XOUT_H, BURST_LEN)
+            ax, ay, az, t, gx, gy, gz = _BURST.unpack(bytes(raw))
+            accelerometer_data = np.array((ax, ay, az)) / ACCEL_SCALE
+            gyroscope_data = np.array((gx, gy, gz)) / GYRO_SCALE
+            temperature = t / 340.0 + 36.53
             return accelerometer_data, gyroscope_data, temperature
         except Exception as e:
             print(f"Sensor read error: {e}")
             return None, None, None
     
+    def read_gyro(self):
+        """Read just the gyro (deg/s) as a (3,) array in one 6-byte burst, or None on error"""
+        try:
+            raw = self.mpu.bus.read_i2c_block_data(self.mpu.address, GYRO_XOUT_H, _GYRO_BURST.size)
+            return np.array(_GYRO_BURST.unpack(bytes(raw))) / GYRO_SCALE
+        except Exception as e:
+            print(f"Sensor read error: {e}")
+            return None
+    
     def calculate_tilt_angles(self, accel_data):
         """
         Calculate pitch and roll angles from accelerometer data
-        Returns angles in degrees
+        Accepts one reading or an (N, 3) batch; returns angles in degrees
         """
-        x = accel_data['x']
-        y = accel_data['y']
-        z = accel_data['z']
+        a = _as_array(accel_data)
+        x, y, z = a[..., 0], a[..., 1], a[..., 2]
         
         # Calculate pitch (rotation around Y-axis)
-        pitch = math.atan2(x, math.sqrt(y**2 + z**2)) * 180 / math.pi
+        pitch = np.degrees(np.arctan2(x, np.hypot(y, z)))
         
         # Calculate roll (rotation around X-axis)
-        roll = math.atan2(y, math.sqrt(x**2 + z**2)) * 180 / math.pi
+        roll = np.degrees(np.arctan2(y, np.hypot(x, z)))
         
-        return {'pitch': pitch, 'roll': roll}
+        return {'pitch': _scalar_or_array(pitch), 'roll': _scalar_or_array(roll)}
+    
+    def _elapsed(self):
+        """Seconds since the previous sample"""
+        current_time = time.monotonic()
+        dt = current_time - self.last_time
+        self.last_time = current_time
+        return dt
     
-    def update_yaw(self, gyro_data):
+    def update_yaw(self, gyro_data, dt=None):
         """
         Calculate yaw angle by integrating gyroscope Z-axis data over time
         Note: Yaw drifts over time without magnetometer correction
         """
-        current_time = time.time()
-        dt = current_time - self.last_time
-        self.last_time = current_time
+        if dt is None:
+            dt = self._elapsed()
         
         # Get calibrated gyro Z reading (rotation around vertical axis)
-        gyro_z = gyro_data['z'] - self.gyro_offset['z']
-        
-        # Integrate gyroscope reading to get yaw angle
-        self.yaw += gyro_z * dt
+        gyro_z = float(_as_array(gyro_data)[2] - self.gyro_offset[2])
         
-        # Normalize yaw to -180 to 180 degrees
-        self.yaw = ((self.yaw + 180) % 360) - 180
+        # Integrate gyroscope reading and wrap yaw to -180..180 degrees in one step
+        self.yaw = math.remainder(self.yaw + gyro_z * dt, 360.0)
         
         return self.yaw
     
     def reset_yaw(self):
         """Reset yaw angle to zero"""
         self.yaw = 0.0
-        self.last_time = time.time()
+        self.last_time = time.monotonic()
     
     def calculate_acceleration_magnitude(self, accel_data):
-        """Calculate total acceleration magnitude in g's"""
-        x = accel_data['x']
-        y = accel_data['y']
-        z = accel_data['z']
-        
-        magnitude = math.sqrt(x**2 + y**2 + z**2)
-        return magnitude
+        """Calculate total acceleration magnitude in g's (one reading or an (N, 3) batch)"""
+        return _scalar_or_array(np.linalg.norm(_as_array(accel_data), axis=-1))
     
     def detect_motion(self, accel_data, threshold=0.15):
         """
@@ -90,37 +185,15 @@ class MPU6050Interpreter:
     
     def detect_orientation(self, accel_data):
         """Detect device orientation based on accelerometer"""
-        x = accel_data['x']
-        y = accel_data['y']
-        z = accel_data['z']
+        v = _as_array(accel_data)
         
-        # Find which axis has the strongest reading
-        abs_x, abs_y, abs_z = abs(x), abs(y), abs(z)
-        
-        if abs_z > abs_x and abs_z > abs_y:
-            if z > 0:
-                return "Face Up"
-            else:
-                return "Face Down"
-        elif abs_y > abs_x:
-            if y > 0:
-                return "Standing on Bottom Edge"
-            else:
-                return "Standing on Top Edge"
-        else:
-            if x > 0:
-                return "Standing on Right Edge"
-            else:
-                return "Standing on Left Edge"
+        # Find which axis has the strongest reading (ties go to the earlier axis)
+        i = int(np.abs(v).argmax())
+        return _ORIENT_LUT[i * 2 + bool(v[i] > 0)]
     
     def calculate_rotation_rate(self, gyro_data):
-        """Calculate total rotation rate in degrees/second"""
-        x = gyro_data['x']
-        y = gyro_data['y']
-        z = gyro_data['z']
-        
-        rotation_rate = math.sqrt(x**2 + y**2 + z**2)
-        return rotation_rate
+        """Calculate total rotation rate in degrees/second (one reading or an (N, 3) batch)"""
+        return _scalar_or_array(np.linalg.norm(_as_array(gyro_data), axis=-1))
     
     def detect_rotation(self, gyro_data, threshold=10.0):
         """
@@ -137,68 +210,87 @@ class MPU6050Interpreter:
         """
         print("Calibrating gyroscope... Keep device still!")
         
-        sum_x, sum_y, sum_z = 0, 0, 0
+        # Collect samples into one (N, 3) buffer and average in a single pass
+        buf = np.empty((samples, 3))
+        count = 0
+        ticker = Ticker(0.01)  # 100 Hz on fixed deadlines
         
         for i in range(samples):
-            _, gyro_data, _ = self.read_sensor_data()
-            if gyro_data:
-                sum_x += gyro_data['x']
-                sum_y += gyro_data['y']
-                sum_z += gyro_data['z']
-            time.sleep(0.01)
+            gyro_data = self.read_gyro()
+            if gyro_data is not None:
+                buf[count] = gyro_data
+                count += 1
+            ticker.wait()
         
-        self.gyro_offset['x'] = sum_x / samples
-        self.gyro_offset['y'] = sum_y / samples
-        self.gyro_offset['z'] = sum_z / samples
+        if count:
+            # Trimmed mean: drop the top and bottom 10% per axis so a bump
+            # during calibration doesn't skew the bias
+            samples_sorted = np.sort(buf[:count], axis=0)
+            trim = count // 10
+            self.gyro_offset = samples_sorted[trim:count - trim].mean(axis=0)
         
-        print(f"Calibration complete! Offsets: {self.gyro_offset}")
+        offsets = dict(zip(AXES, self.gyro_offset.round(4).tolist()))
+        print(f"Calibration complete! Offsets: {offsets}")
     
     def get_calibrated_gyro(self, gyro_data):
         """Apply calibration offset to gyroscope data"""
+        return dict(zip(AXES, (_as_array(gyro_data) - self.gyro_offset).tolist()))
+    
+    def record(self, accel_data, gyro_data):
+        """Store a reading in the ring buffers"""
+        i = self._buf_pos
+        self._accel_buf[i] = _as_array(accel_data)
+        self._gyro_buf[i] = _as_array(gyro_data)
+        self._buf_pos = (i + 1) % HISTORY
+        self._buf_count = min(self._buf_count + 1, HISTORY)
+    
+    def interpret_history(self):
+        """Compute tilt, magnitude and rotation rate over the buffered readings in one pass"""
+        n = self._buf_count
+        if n == 0:
+            return None
+        accel = self._accel_buf[:n]
+        gyro = self._gyro_buf[:n] - self.gyro_offset
+        tilt = self.calculate_tilt_angles(accel)
         return {
-            'x': gyro_data['x'] - self.gyro_offset['x'],
-            'y': gyro_data['y'] - self.gyro_offset['y'],
-            'z': gyro_data['z'] - self.gyro_offset['z']
+            'samples': n,
+            'pitch': tilt['pitch'],
+            'roll': tilt['roll'],
+            'accel_magnitude': self.calculate_acceleration_magnitude(accel),
+            'rotation_rate': self.calculate_rotation_rate(gyro)
         }
     
-    def interpret_data(self, accel_data, gyro_data, temperature):
+    def interpret_data(self, accel_data, gyro_data, temperature, motion_threshold=0.15, rotation_threshold=10.0):
         """Interpret all sensor data and return analysis"""
         if accel_data is None or gyro_data is None:
             return None
         
-        # Calculate tilt angles
-        tilt = self.calculate_tilt_angles(accel_data)
-        
-        # Update yaw angle
-        yaw = self.update_yaw(gyro_data)
-        
-        # Calculate acceleration magnitude
-        accel_magnitude = self.calculate_acceleration_magnitude(accel_data)
-        
-        # Detect motion
-        in_motion = self.detect_motion(accel_data)
-        
-        # Detect orientation
-        orientation = self.detect_orientation(accel_data)
-        
-        # Get calibrated gyro data
-        calibrated_gyro = self.get_calibrated_gyro(gyro_data)
-        
-        # Calculate rotation rate
-        rotation_rate = self.calculate_rotation_rate(calibrated_gyro)
+        accel = _as_array(accel_data)
+        gyro = _as_array(gyro_data)
+        self.record(accel, gyro)
         
-        # Detect rotation
-        is_rotating = self.detect_rotation(calibrated_gyro)
+        # All per-sample arithmetic happens in one compiled call
+        ax, ay, az = accel.tolist()
+        gx, gy, gz = gyro.tolist()
+        ox, oy, oz = self.gyro_offset.tolist()
+        seeded = self.pitch is not None
+        (pitch_acc, roll_acc, accel_magnitude, cgx, cgy, cgz, rotation_rate,
+         self.yaw, pitch, roll) = _interpret_core(
+            ax, ay, az, gx, gy, gz, self._elapsed(),
+            self.yaw, self.pitch if seeded else 0.0, self.roll if seeded else 0.0,
+            ox, oy, oz, self.alpha, seeded)
+        self.pitch, self.roll = pitch, roll
         
         return {
-            'tilt': tilt,
-            'yaw': yaw,
+            'tilt': {'pitch': pitch_acc, 'roll': roll_acc},
+            'fused_tilt': {'pitch': pitch, 'roll': roll},
+            'yaw': self.yaw,
             'accel_magnitude': accel_magnitude,
-            'in_motion': in_motion,
-            'orientation': orientation,
+            'in_motion': abs(accel_magnitude - 1.0) > motion_threshold,
+            'orientation': self.detect_orientation(accel),
             'rotation_rate': rotation_rate,
-            'is_rotating': is_rotating,
-            'calibrated_gyro': calibrated_gyro,
+            'is_rotating': rotation_rate > rotation_threshold,
+            'calibrated_gyro': {'x': cgx, 'y': cgy, 'z': cgz},
             'temperature_c': temperature
         }
     
@@ -217,6 +309,8 @@ class MPU6050Interpreter:
         print(f"\n📐 Tilt Angles:")
         print(f"   Pitch: {interpretation['tilt']['pitch']:>7.2f}°")
         print(f"   Roll:  {interpretation['tilt']['roll']:>7.2f}°")
+        print(f"   Pitch: {interpretation['fused_tilt']['pitch']:>7.2f}° (gyro fused)")
+        print(f"   Roll:  {interpretation['fused_tilt']['roll']:>7.2f}° (gyro fused)")
         print(f"   Yaw:   {interpretation['yaw']:>7.2f}° (integrated from gyro)")
         
         print(f"\n📍 Orientation: {interpretation['orientation']}")
@@ -249,6 +343,7 @@ def main():
     print("    Press 'r' during monitoring to reset yaw to 0°")
     print("\nStarting continuous monitoring... (Ctrl+C to stop)")
     
+    ticker = Ticker(1.0)
     try:
         while True:
             # Read sensor data
@@ -269,7 +364,7 @@ def main():
             else:
                 print("Warning: Failed to read sensor data")
             
-            time.sleep(1)
+            ticker.wait()
             
     except KeyboardInterrupt:
         print("\n\nStopping sensor monitoring...")
@@ -1,13 +1,28 @@
 import mpu6050
+import struct
 import time
 
 mpu6050 = mpu6050.mpu6050(0x68)
 
+# Accel, temp and gyro sit in 14 consecutive registers starting at
+# ACCEL_XOUT_H, so one block read replaces the three library reads
+ACCEL_XOUT_H = 0x3B
+BURST_LEN = 14
+_BURST = struct.Struct('>7h')
+ACCEL_SCALE = 16384.0  # LSB/g at the default +/-2g range
+GYRO_SCALE = 131.0     # LSB/(deg/s) at the default +/-250 deg/s range
+GRAVITY_MS2 = mpu6050.GRAVITIY_MS2
+
 def read_sensor_data():
     try:
-        accelerometer_data = mpu6050.get_accel_data()
-        gyroscope_data = mpu6050.get_gyro_data()
-        temperature = mpu6050.get_temp()
+        raw = mpu6050.bus.read_i2c_block_data(mpu6050.address, ACCEL_XOUT_H, BURST_LEN)
+        ax, ay, az, t, gx, gy, gz = _BURST.unpack(bytes(raw))
+        # Same units as get_accel_data / get_gyro_data / get_temp: m/s^2, not g
+        # as in MPU-Interpreter.py
+        accel = GRAVITY_MS2 / ACCEL_SCALE
+        accelerometer_data = {'x': ax * accel, 'y': ay * accel, 'z': az * accel}
+        gyroscope_data = {'x': gx / GYRO_SCALE, 'y': gy / GYRO_SCALE, 'z': gz / GYRO_SCALE}
+        temperature = t / 340.0 + 36.53
         return accelerometer_data, gyroscope_data, temperature
     except Exception as e:
         print(f"Sensor read error: {e}")
@@ -1,44 +1,114 @@
 import sys
 import time
+import queue
+import threading
+import numpy as np
 import RPi.GPIO as GPIO
 import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation
+from deadline_sleep import monotonic_ns, sleep_until
 
 GPIO.setmode(GPIO.BOARD)
 
 RESISTORPIN = 16
 SUNTHRESHOLD = 0.6
 
+
+class LDR:
+    """RC-timed light sensor: discharge the capacitor, then time the recharge"""
+
+    def __init__(self, pin):
+        self.pin = pin
+        self._last_diff = 0.1  # Until measured, assume the slowest useful discharge
+        self._discharge()
+
+    def _discharge(self):
+        """Drive the pin low to start draining the capacitor"""
+        GPIO.setup(self.pin, GPIO.OUT, initial=GPIO.LOW)
+        self._discharge_start = monotonic_ns()
+
+    def read_light_intensity(self):
+        """Return the charge time in seconds (2.0 on timeout, 0 if already charged)"""
+        # Finish discharging: ~5 RC is enough, and RC tracks the last charge time.
+        # The discharge began at the end of the previous read, so time spent
+        # between reads already counts toward it
+        discharge_t = min(0.1, max(0.001, 5 * self._last_diff))
+        sleep_until(self._discharge_start + int(discharge_t * 1e9))
+
+        # Measure charge time: block in the kernel until the rising edge
+        # instead of polling the pin from Python
+        GPIO.setup(self.pin, GPIO.IN)
+        t0 = time.perf_counter_ns()
+        if GPIO.input(self.pin) == GPIO.LOW:
+            # 2 second timeout for very dark conditions
+            if GPIO.wait_for_edge(self.pin, GPIO.RISING, timeout=2000) is not None:
+                diff = (time.perf_counter_ns() - t0) / 1e9
+            elif GPIO.input(self.pin) == GPIO.HIGH:
+                # The pin rose between the check above and arming the edge
+                # detector, so the edge was missed: a fast charge, not darkness
+                diff = 0
+            else:
+                diff = 2.0
+        else:
+            diff = 0  # Already charged - very bright
+
+        self._last_diff = diff
+        self._discharge()
+        return diff
+
+
+class RingBuffer:
+    """Fixed-size float32 history; view() is oldest-first and never copies"""
+
+    def __init__(self, size):
+        # Every sample is written twice, size apart, so the newest `size`
+        # samples are always one contiguous slice
+        self._buf = np.zeros(2 * size, np.float32)
+        self._size = size
+        self._idx = 0
+        self._count = 0
+
+    def append(self, value):
+        self._buf[self._idx] = self._buf[self._idx + self._size] = value
+        self._idx = (self._idx + 1) % self._size
+        self._count = min(self._count + 1, self._size)
+
+    def view(self):
+        end = self._idx + self._size
+        return self._buf[end - self._count:end]
+
+
 # --- Plot setup ---
-plt.ion()  # interactive mode
+# Axes are fixed so FuncAnimation can blit just the line each frame: x is
+# "seconds ago" over a sliding window, y is log-scaled to span dark..sun
+WINDOW_S = 30
+MAX_POINTS = 500
+
 fig, ax = plt.subplots()
-times = []
-values = []
-line, = ax.plot(times, values)
+times = RingBuffer(MAX_POINTS)
+values = RingBuffer(MAX_POINTS)
+line, = ax.plot([], [])
 
-ax.set_xlabel("Time (s)")
+ax.set_xlabel("Time (s ago)")
 ax.set_ylabel("Light")
 ax.set_title("Light over time")
+ax.set_xlim(-WINDOW_S, 0)
+ax.set_yscale("log")
+ax.set_ylim(1e-4, 2e3)
+ax.axhline(SUNTHRESHOLD, color="orange", linestyle="--")
 
 start_time = time.time()
+ldr = LDR(RESISTORPIN)
+
+# The sensor is read on its own thread so the blocking discharge/charge
+# timing never stalls redraws; the plot drains whatever has arrived
+samples = queue.SimpleQueue()
+stop = threading.Event()
 
-try:
-    while True:
-        # Discharge capacitor
-        GPIO.setup(RESISTORPIN, GPIO.OUT)
-        GPIO.output(RESISTORPIN, GPIO.LOW)
-        time.sleep(0.1)
-
-        # Measure charge time
-        GPIO.setup(RESISTORPIN, GPIO.IN)
-        currentTime = time.time()
-        diff = 0  # Initialize diff variable
-        
-        # Add timeout to prevent infinite loop
-        while GPIO.input(RESISTORPIN) == GPIO.LOW:
-            diff = time.time() - currentTime
-            if diff > 2.0:  # 2 second timeout for very dark conditions
-                break
 
+def sensor_loop():
+    while not stop.is_set():
+        diff = ldr.read_light_intensity()
         diff_ms = diff * 1000
         elapsed = time.time() - start_time
 
@@ -53,27 +123,35 @@ try:
         if light > SUNTHRESHOLD:
             print("SUN DETECTED")
 
-        # --- Store data ---
-        times.append(elapsed)
-        values.append(light)
+        samples.put((elapsed, light))
 
-        # Limit points (keeps plot fast)
-        times = times[-100:]
-        values = values[-100:]
 
-        # --- Update plot ---
-        line.set_xdata(times)
-        line.set_ydata(values)
-        ax.relim()
-        ax.autoscale_view()
+def update(frame):
+    # --- Store data (ring buffers overwrite the oldest points in place) ---
+    try:
+        while True:
+            elapsed, light = samples.get_nowait()
+            times.append(elapsed)
+            values.append(light)
+    except queue.Empty:
+        pass
 
-        plt.pause(0.01)
-        time.sleep(0.1)
+    # --- Update plot ---
+    line.set_data(times.view() - (time.time() - start_time), values.view())
+    return (line,)
+
+
+sensor_thread = threading.Thread(target=sensor_loop, daemon=True)
+
+try:
+    sensor_thread.start()
+    anim = FuncAnimation(fig, update, interval=50, blit=True, cache_frame_data=False)
+    plt.show()
 
 except KeyboardInterrupt:
     print("Exiting...")
 
 finally:
+    stop.set()
+    sensor_thread.join(timeout=3)
     GPIO.cleanup()
-    plt.ioff()
-    plt.show()
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+Absolute-deadline sleeping for fixed-rate sensor loops
+
+Sleeping to an absolute CLOCK_MONOTONIC deadline (TIMER_ABSTIME) keeps a
+loop on schedule: per-iteration work and signal interruptions don't add up
+the way repeated relative time.sleep() calls do.
+"""
+
+import ctypes
+import ctypes.util
+import time
+
+CLOCK_MONOTONIC = 1
+TIMER_ABSTIME = 1
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    _clock_nanosleep = _libc.clock_nanosleep
+    _clock_nanosleep.argtypes = [ctypes.c_int, ctypes.c_int,
+                                 ctypes.POINTER(_Timespec), ctypes.POINTER(_Timespec)]
+except (OSError, AttributeError, TypeError):
+    _clock_nanosleep = None  # Not Linux - fall back to relative sleeps
+
+
+def monotonic_ns():
+    """Current monotonic time in nanoseconds (CLOCK_MONOTONIC on Linux)"""
+    return time.monotonic_ns()
+
+
+def sleep_until(deadline_ns):
+    """Block until CLOCK_MONOTONIC reaches deadline_ns (returns at once if it already has)"""
+    if _clock_nanosleep is None:
+        time.sleep(max(0, deadline_ns - monotonic_ns()) / 1e9)
+        return
+    ts = _Timespec(deadline_ns // 1_000_000_000, deadline_ns % 1_000_000_000)
+    # Restart after EINTR; the deadline is absolute so nothing drifts
+    while _clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME, ctypes.byref(ts), None) == 4:
+        pass
+
+
+class Ticker:
+    """Yields control at a fixed period measured from a fixed start time"""
+
+    def __init__(self, period_s):
+        self.period_ns = int(period_s * 1e9)
+        self.deadline = monotonic_ns()
+
+    def wait(self):
+        """Sleep until the next tick; if a tick was overrun, resync rather than burst"""
+        self.deadline += self.period_ns
+        now = monotonic_ns()
+        if self.deadline < now:
+            self.deadline = now
+        sleep_until(self.deadline)
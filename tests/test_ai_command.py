@@ -0,0 +1,110 @@
+# tests/test_ai_command.py
+import sys
+import os
+os.environ["TESTING"] = "1"   # prevents background thread from starting
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import time
+import zlib
+from types import SimpleNamespace
+import pytest
+import FlaskServer as _fs
+from FlaskServer import app
+
+
+def _chunk(thinking=None, content=None):
+    return SimpleNamespace(message=SimpleNamespace(thinking=thinking, content=content))
+
+
+@pytest.fixture
+def client():
+    app.config["TESTING"] = True
+    with app.test_client() as c:
+        yield c
+
+
+@pytest.fixture
+def fake_chat(monkeypatch):
+    chunks = []
+    monkeypatch.setattr(_fs._OLLAMA, "chat", lambda **kwargs: iter(chunks))
+    return chunks
+
+
+def _events(response):
+    events = []
+    for line in response.get_data().decode().split('\n'):
+        if line.startswith('data: '):
+            events.append(json.loads(line[6:]))
+    return events
+
+
+class TestAiCommand:
+    def test_missing_message_returns_400(self, client):
+        r = client.post('/ai_command',
+                        data=json.dumps({'message': ''}),
+                        content_type='application/json')
+        assert r.status_code == 400
+
+    def test_streams_thinking_content_and_result(self, client, fake_chat):
+        fake_chat.extend([
+            _chunk(thinking='let me "think"\n'),
+            _chunk(content='{"type": "bash_command", '),
+            _chunk(content='"fields": {"command": "ls"}}'),
+        ])
+        r = client.post('/ai_command',
+                        data=json.dumps({'message': 'list files'}),
+                        content_type='application/json')
+        events = _events(r)
+        types = [e['type'] for e in events]
+        assert types[0] == 'thinking_start'
+        assert 'thinking_end' in types
+        assert types[-2:] == ['result', 'done']
+        thinking = ''.join(e['content'] for e in events if e['type'] == 'thinking')
+        assert thinking == 'let me "think"\n'
+        assert events[-2]['command'] == {'type': 'bash_command', 'fields': {'command': 'ls'}}
+
+    def test_unparseable_output_emits_error(self, client, fake_chat):
+        fake_chat.append(_chunk(content='not json'))
+        r = client.post('/ai_command',
+                        data=json.dumps({'message': 'hi'}),
+                        content_type='application/json')
+        types = [e['type'] for e in _events(r)]
+        assert types[-2:] == ['error', 'done']
+
+    def test_gzip_stream_decodes_to_same_events(self, client, fake_chat):
+        fake_chat.extend([
+            _chunk(thinking='abc'),
+            _chunk(content='{"type": "bash_command", "fields": {}}'),
+        ])
+        r = client.post('/ai_command',
+                        data=json.dumps({'message': 'hi'}),
+                        content_type='application/json',
+                        headers={'Accept-Encoding': 'gzip'})
+        assert r.headers['Content-Encoding'] == 'gzip'
+        body = zlib.decompress(r.get_data(), zlib.MAX_WBITS | 16).decode()
+        types = [json.loads(l[6:])['type'] for l in body.split('\n') if l.startswith('data: ')]
+        assert types == ['thinking_start', 'thinking', 'thinking_end', 'content', 'result', 'done']
+
+    def test_consecutive_tokens_are_coalesced(self, client, fake_chat):
+        answer = '{"type": "bash_command", "fields": {"command": "ls"}}'
+        fake_chat.extend(_chunk(content=c) for c in answer)
+        r = client.post('/ai_command',
+                        data=json.dumps({'message': 'hi'}),
+                        content_type='application/json')
+        content = [e['content'] for e in _events(r) if e['type'] == 'content']
+        assert ''.join(content) == answer
+        assert len(content) < len(answer)
+
+    def test_pending_batch_flushed_while_model_stalls(self, client, monkeypatch):
+        def slow_stream():
+            yield _chunk(content='{"type": "bash_command", ')
+            time.sleep(0.3)  # Model pauses well past the flush window
+            yield _chunk(content='"fields": {"command": "ls"}}')
+
+        monkeypatch.setattr(_fs._OLLAMA, "chat", lambda **kwargs: slow_stream())
+        r = client.post('/ai_command',
+                        data=json.dumps({'message': 'hi'}),
+                        content_type='application/json')
+        content = [e['content'] for e in _events(r) if e['type'] == 'content']
+        assert content == ['{"type": "bash_command", ', '"fields": {"command": "ls"}}']
@@ -0,0 +1,65 @@
+# tests/test_command_executor.py
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import pytest
+from robot import command_executor as ce
+from robot.command_executor import execute_read_file
+
+
+@pytest.fixture(autouse=True)
+def empty_file_cache():
+    with ce._file_cache_lock:
+        ce._FILE_CACHE.clear()
+        ce._file_cache_chars = 0
+    yield
+    with ce._file_cache_lock:
+        ce._FILE_CACHE.clear()
+        ce._file_cache_chars = 0
+
+
+def _settled(path):
+    """Backdate the file's mtime so it is old enough to be cached."""
+    past = time.time() - 60
+    os.utime(path, (past, past))
+
+
+class TestReadFileCache:
+    def test_unchanged_file_served_from_cache(self, tmp_path, monkeypatch):
+        path = tmp_path / "a.txt"
+        path.write_text("hello")
+        _settled(path)
+        assert execute_read_file(str(path))['content'] == "hello"
+
+        # A second read must not touch the file contents
+        monkeypatch.setattr(ce.Path, "read_text", lambda self: pytest.fail("read from disk"))
+        assert execute_read_file(str(path))['content'] == "hello"
+
+    def test_rewritten_file_is_reread(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("hello")
+        _settled(path)
+        execute_read_file(str(path))
+        path.write_text("hello, world")
+        _settled(path)
+        assert execute_read_file(str(path))['content'] == "hello, world"
+
+    def test_recently_modified_file_not_cached(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("hello")
+        execute_read_file(str(path))
+        assert ce._FILE_CACHE == {}
+
+    def test_empty_file_not_cached(self, tmp_path):
+        path = tmp_path / "empty.txt"
+        path.write_text("")
+        _settled(path)
+        assert execute_read_file(str(path))['content'] == ""
+        assert ce._FILE_CACHE == {}
+
+    @pytest.mark.skipif(not os.path.exists("/proc/self/stat"), reason="needs procfs")
+    def test_procfs_file_read_fresh(self):
+        assert execute_read_file("/proc/self/stat")['status'] == "success"
+        assert ce._FILE_CACHE == {}
@@ -0,0 +1,56 @@
+# tests/test_execute_endpoint.py
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+class TestExecute:
+    def test_bash_command(self, client):
+        r = client.post('/execute', json={'type': 'bash_command', 'command': 'echo hi'})
+        data = r.json()
+        assert data['status'] == 'success'
+        assert data['stdout'] == 'hi\n'
+        assert data['return_code'] == 0
+
+    def test_unknown_type(self, client):
+        r = client.post('/execute', json={'type': 'nope'})
+        assert r.json()['error_type'] == 'ValidationError'
+
+    def test_commands_do_not_block_each_other(self, client):
+        payload = {'type': 'bash_command', 'command': 'sleep 1'}
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(lambda _: client.post('/execute', json=payload), range(2)))
+        assert all(r.json()['status'] == 'success' for r in results)
+        assert time.monotonic() - start < 1.8
+
+    def test_concurrent_basic_actions_capture_their_own_output(self, client):
+        code = "import time\nfor i in range(3):\n    print('{0}', i)\n    time.sleep(0.05)"
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(
+                lambda k: client.post('/execute', json={'type': 'basic_action', 'action': code.format(k)}),
+                range(4)))
+        for k, r in enumerate(results):
+            assert r.json()['output'] == ''.join(f'{k} {i}\n' for i in range(3))
+
+    def test_basic_actions_run_one_at_a_time(self, client):
+        code = ("import threading, time\n"
+                "print(sum(t.name.startswith('basic_action') for t in threading.enumerate()))\n"
+                "time.sleep(0.1)")
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            results = list(pool.map(
+                lambda _: client.post('/execute', json={'type': 'basic_action', 'action': code}),
+                range(3)))
+        assert [r.json()['output'] for r in results] == ['1\n'] * 3
@@ -4,6 +4,7 @@ import os
 os.environ["TESTING"] = "1"   # prevents background thread from starting
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import asyncio
 import json
 import pytest
 import FlaskServer as _fs
@@ -81,3 +82,55 @@ class TestConfig:
                         content_type='application/json')
         data = json.loads(r.data)
         assert data.get('jetson_ws_url') == 'ws://10.0.0.5:9001'
+
+    def test_config_post_invalid_json_returns_400(self, client):
+        r = client.post('/config', data='{not json', content_type='application/json')
+        assert r.status_code == 400
+
+    def test_config_get_reflects_post(self, client):
+        client.post('/config',
+                    data=json.dumps({'timeout': 12, 'mode': 'lora'}),
+                    content_type='application/json')
+        data = json.loads(client.get('/config').data)
+        assert data['timeout'] == 12
+        assert data['mode'] == 'lora'
+        client.post('/config',
+                    data=json.dumps({'timeout': 35, 'mode': 'wifi'}),
+                    content_type='application/json')
+
+
+class TestMapStreamDisconnect:
+    def test_disconnected_client_is_unregistered(self):
+        async def run():
+            disconnected = asyncio.Event()
+            got_body = asyncio.Event()
+            requested = False
+
+            async def receive():
+                nonlocal requested
+                if not requested:
+                    requested = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                if message["type"] == "http.response.body" and message.get("body"):
+                    got_body.set()
+
+            scope = {"type": "http", "method": "GET", "path": "/map_stream", "root_path": "",
+                     "query_string": b"", "headers": [], "http_version": "1.1"}
+            task = asyncio.create_task(_fs.asgi_app(scope, receive, send))
+            while not _sse_clients:
+                await asyncio.sleep(0.01)
+            _sse_clients[0].put('{"type":"chunk"}')
+            await asyncio.wait_for(got_body.wait(), 5)
+
+            # Sends after this succeed silently, as they do under uvicorn
+            disconnected.set()
+            await asyncio.wait_for(task, 5)
+
+        with _sse_lock:
+            _sse_clients.clear()
+        asyncio.run(run())
+        assert _sse_clients == []
@@ -0,0 +1,130 @@
+# tests/test_send_command.py
+import sys
+import os
+os.environ["TESTING"] = "1"   # prevents background thread from starting
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import pytest
+import requests
+import FlaskServer as _fs
+from FlaskServer import app
+
+
+class _FakeRoverResponse:
+    status_code = 200
+    headers = {"Content-Type": "application/json"}
+
+    def __init__(self, body, raw=None, error=None):
+        self._raw = json.dumps(body).encode() if raw is None else raw
+        self._error = error
+        self.closed = False
+
+    def iter_content(self, chunk_size=1):
+        if self._error is not None:
+            raise self._error
+        for i in range(0, len(self._raw), chunk_size):
+            yield self._raw[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def client():
+    app.config["TESTING"] = True
+    with app.test_client() as c:
+        yield c
+
+
+def _post(client, payload):
+    return client.post('/send_command',
+                       data=json.dumps(payload),
+                       content_type='application/json')
+
+
+class TestSendWifi:
+    def test_forwards_through_shared_session(self, client, monkeypatch):
+        calls = []
+
+        def fake_post(url, json=None, timeout=None, stream=False):
+            calls.append((url, json, timeout))
+            return _FakeRoverResponse({"status": "success", "stdout": "hi\n"})
+
+        monkeypatch.setattr(_fs._SESSION, "post", fake_post)
+        r = _post(client, {'mode': 'wifi', 'type': 'bash_command', 'command': 'echo hi', 'timeout': 5})
+        data = json.loads(r.data)
+        assert r.status_code == 200
+        assert data['success'] is True
+        assert data['status_code'] == 200
+        assert data['data']['stdout'] == "hi\n"
+        assert r.headers['X-Rover-Status'] == '200'
+        assert calls == [(_fs._CFG.server_url, {'type': 'bash_command', 'command': 'echo hi'}, 5)]
+
+    def test_connection_error_returns_503(self, client, monkeypatch):
+        def fake_post(*args, **kwargs):
+            raise requests.exceptions.ConnectionError()
+
+        monkeypatch.setattr(_fs._SESSION, "post", fake_post)
+        r = _post(client, {'mode': 'wifi', 'type': 'bash_command', 'command': 'ls'})
+        assert r.status_code == 503
+
+    def test_empty_body_returns_null_data(self, client, monkeypatch):
+        rover = _FakeRoverResponse(None, raw=b'')
+        monkeypatch.setattr(_fs._SESSION, "post", lambda *a, **kw: rover)
+        r = _post(client, {'mode': 'wifi', 'type': 'bash_command', 'command': 'ls'})
+        assert r.status_code == 200
+        assert json.loads(r.data) == {'success': True, 'status_code': 200, 'data': None}
+        assert rover.closed
+
+    def test_first_read_error_returns_503(self, client, monkeypatch):
+        rover = _FakeRoverResponse(None, error=requests.exceptions.ConnectionError())
+        monkeypatch.setattr(_fs._SESSION, "post", lambda *a, **kw: rover)
+        r = _post(client, {'mode': 'wifi', 'type': 'bash_command', 'command': 'ls'})
+        assert r.status_code == 503
+        assert rover.closed
+
+    def test_timeout_returns_408(self, client, monkeypatch):
+        def fake_post(*args, **kwargs):
+            raise requests.exceptions.Timeout()
+
+        monkeypatch.setattr(_fs._SESSION, "post", fake_post)
+        r = _post(client, {'mode': 'wifi', 'type': 'bash_command', 'command': 'ls'})
+        assert r.status_code == 408
+
+
+class TestSendLora:
+    def test_writes_message_file(self, client, monkeypatch, tmp_path):
+        path = tmp_path / "message.json"
+        monkeypatch.setattr(_fs, "LORA_MESSAGE_PATH", str(path))
+        r = _post(client, {'mode': 'lora', 'lora_destination': 3, 'type': 'bash_command', 'command': 'ls'})
+        data = json.loads(r.data)
+        assert r.status_code == 200
+        assert data['data']['recipient'] == 3
+        assert json.loads(path.read_text()) == {'Recipient': 3, 'type': 'bash_command', 'command': 'ls'}
+        assert data['data']['payload_size'] == path.stat().st_size
+        assert not (tmp_path / "message.json.tmp").exists()
+
+    def test_missing_drive_returns_503(self, client, monkeypatch, tmp_path):
+        monkeypatch.setattr(_fs, "LORA_MESSAGE_PATH", str(tmp_path / "missing" / "message.json"))
+        r = _post(client, {'mode': 'lora', 'type': 'bash_command', 'command': 'ls'})
+        assert r.status_code == 503
+
+
+class TestBodyLimits:
+    def test_oversize_config_body_rejected(self, client):
+        r = client.post('/config',
+                        data=json.dumps({'server_url': 'x' * (2 * 1024 * 1024)}),
+                        content_type='application/json')
+        assert r.status_code == 413
+
+    def test_send_command_allows_larger_file_payloads(self, client, monkeypatch, tmp_path):
+        monkeypatch.setattr(_fs, "LORA_MESSAGE_PATH", str(tmp_path / "message.json"))
+        r = _post(client, {'mode': 'lora', 'type': 'edit_file', 'file_name': 'a.txt',
+                           'file_content': 'x' * (2 * 1024 * 1024)})
+        assert r.status_code == 200
+
+    def test_send_command_over_limit_rejected(self, client):
+        r = _post(client, {'mode': 'lora', 'type': 'edit_file', 'file_name': 'a.txt',
+                           'file_content': 'x' * (17 * 1024 * 1024)})
+        assert r.status_code == 413